@@ -0,0 +1,170 @@
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from uuid import uuid1
+
+import numpy as np
+
+from genetic_algorithm import Solution, evaluate_population, import_function_by_fqn
+from operators import KINDS, OPERATORS, list_operators
+from taskplanner import generate_instance, solve
+
+
+# Every axis is varied on its own, the other two stay at BASE_SIZE.
+BASE_SIZE = {"num_tasks": 200, "num_employees": 10, "population_size": 100}
+AXES = {
+    "num_tasks": [50, 200, 1000, 3000, 10000],
+    "num_employees": [4, 10, 50, 200],
+    "population_size": [50, 100, 500, 2000],
+}
+QUICK_AXES = {
+    "num_tasks": [50, 200, 1000],
+    "num_employees": [4, 10, 50],
+    "population_size": [50, 100, 500],
+}
+L = 40
+
+
+def registered_functions():
+    # fqn of every registered breed, mutate and select function (see operators.py)
+    return {kind: [operator.fqn for operator in list_operators(kind)] for kind in KINDS}
+
+
+def make_population(size):
+    return [Solution(solve(*Solution.get_data_and_config())) for _ in range(size)]
+
+
+def setup_instance(num_tasks, num_employees, population_size, seed=0):
+    T, Z, p = generate_instance(num_tasks, num_employees, seed=seed)
+    Solution.initialize(T.tolist(), Z.tolist(), p.tolist(), L, num_employees, num_tasks)
+    random.seed(seed)
+    # parents (evaluated, as in evolve_generation) and children of the size breeding would produce
+    population = make_population(population_size)
+    evaluate_population(population)
+    children = make_population(population_size)
+    return population, children
+
+
+def operator_arguments(kind, population, children):
+    # fresh copies for every call (operators change their arguments), made outside of the measured time
+    if kind == "breed":
+        return ([sol.copy() for sol in population],)
+    if kind in ("mutate", "evaluate"):
+        return ([sol.copy() for sol in children],)
+    children = [sol.copy() for sol in children]
+    evaluate_population(children)  # select gets evaluated children, as in evolve_generation
+    return ([sol.copy() for sol in population], children)
+
+
+def measure(kind, function, population, children, repeat=3, seed=0):
+    """
+    Best of `repeat` calls of one operator: seconds per call, individuals produced (breed, mutate)
+    or selected (select) and fitness evaluations per second. Peak memory (bytes allocated during the call,
+    traced by tracemalloc) is measured in a separate call.
+    """
+    best = None
+    for i in range(repeat):
+        arguments = operator_arguments(kind, population, children)
+        random.seed(seed + i)
+        np.random.seed(seed + i)
+        evaluations = Solution.evaluations
+        start = time.perf_counter()
+        produced = len(function(*arguments))
+        seconds = time.perf_counter() - start
+        if best is None or seconds < best["seconds"]:
+            best = {
+                "seconds": seconds,
+                "individuals_per_second": produced / seconds,
+                "evaluations_per_second": (Solution.evaluations - evaluations) / seconds,
+            }
+
+    arguments = operator_arguments(kind, population, children)
+    random.seed(seed)
+    np.random.seed(seed)
+    tracemalloc.start()
+    function(*arguments)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    best["peak_memory_bytes"] = peak
+    return best
+
+
+def scaling_exponent(sizes, seconds):
+    # slope of log(time) over log(size): ~1 linear, ~2 quadratic
+    if len(sizes) < 2:
+        return None
+    return float(np.polyfit(np.log(sizes), np.log(seconds), 1)[0])
+
+
+def run_benchmark(axes=AXES, repeat=3, time_limit=10.0, functions=None, output=None):
+    """
+    Runs every registered operator (or `functions`: dict of kind -> list of fqn) and `evaluate_population` on generated instances,
+    growing one axis of `axes` at a time from `BASE_SIZE`. An operator whose call takes longer than
+    `time_limit` seconds is not run on the larger sizes of that axis.
+    Writes a JSON report to `output` with every measurement and the scaling exponent of every operator
+    along every axis, and returns it.
+    """
+    functions = functions or registered_functions()
+    operators = [(kind, fqn, import_function_by_fqn(fqn)) for kind, fqns in functions.items() for fqn in fqns]
+    # batch evaluation of unevaluated children as the reference for evaluations per second
+    operators.append(("evaluate", "genetic_algorithm.evaluate_population", evaluate_population))
+
+    results = []
+    scaling = {fqn: {} for _, fqn, _ in operators}
+    for axis, values in axes.items():
+        too_slow = set()
+        measured = {fqn: ([], []) for _, fqn, _ in operators}
+        for value in values:
+            size = {**BASE_SIZE, axis: value}
+            population, children = setup_instance(**size)
+            for kind, fqn, function in operators:
+                if fqn in too_slow:
+                    continue
+                result = measure(kind, function, population, children, repeat)
+                results.append({"operator": fqn, "kind": kind, "axis": axis, **size, **result})
+                measured[fqn][0].append(value)
+                measured[fqn][1].append(result["seconds"])
+                if result["seconds"] > time_limit:
+                    too_slow.add(fqn)
+                print(f"{axis}={value:<6} {fqn:<70} {result['seconds'] * 1000:12.3f} ms", file=sys.stderr)
+        for fqn, (sizes, seconds) in measured.items():
+            scaling[fqn][axis] = scaling_exponent(sizes, seconds)
+
+    report = {
+        "environment": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "base_size": BASE_SIZE,
+        "axes": axes,
+        "L": L,
+        "repeat": repeat,
+        "time_limit": time_limit,
+        "results": results,
+        "scaling_exponents": scaling,
+        # registry metadata next to the measurements, e.g. to compare batch and cell-by-cell operators
+        "operators": {
+            fqn: {"batch": OPERATORS[fqn].batch, "needs_repair": OPERATORS[fqn].needs_repair, "cost": OPERATORS[fqn].cost}
+            for _, fqn, _ in operators if fqn in OPERATORS
+        },
+    }
+    if output is None:
+        output = f"benchmark_{uuid1()}.json"
+    with open(output, "w") as f:
+        json.dump(report, f, indent=4)
+    print(f"Report saved to {output}")
+    return report
+
+
+if __name__ == "__main__":
+    # python benchmark.py [output_file] [--quick]
+    quick = "--quick" in sys.argv
+    if quick:
+        sys.argv.remove("--quick")
+    run_benchmark(QUICK_AXES if quick else AXES, output=sys.argv[1] if len(sys.argv) > 1 else None)
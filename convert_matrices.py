@@ -0,0 +1,14 @@
+import sys
+
+from file_manager import FileManager
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Folder name not specified; using default='experiments'")
+        folder_name = 'experiments'
+    else:
+        folder_name = sys.argv[1]
+
+    # T.json, Z.json, p.json -> T.npy, Z.npy, p.npy (for "data_load_mode": "npy")
+    FileManager(folder_name).convert_matrices_to_npy()
+    print(f"Saved T.npy, Z.npy and p.npy in {folder_name}")
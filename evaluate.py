@@ -1,10 +1,8 @@
+import numpy as np
 from tqdm import tqdm
 
-from dominance_hierarchy_functions import dominant_solution_breed_swap_employees
-from example_function_file import select_children
 from genetic_algorithm import evolutionary_algorithm, Solution, get_evaluator_fn
-from lukasz_function import mutation
-from taskplanner import Employee, generate_tasks, generate_input_matrices, solve
+from taskplanner import Employee, generate_tasks, generate_input_matrices, generate_instance, solve
 import matplotlib.pyplot as plt
 
 
@@ -35,7 +33,7 @@ def run_once():
         print(round(sum([T[j][i] * R[j][i] for i in range(num_tasks)]), 2))
 
 
-def run_evaluate():
+def run_evaluate(seed=None):
     L = 40
     num_tasks = 40
     employees = [
@@ -61,17 +59,17 @@ def run_evaluate():
         starting_population = [Solution(solve(*Solution.get_data_and_config())) for _ in range(200)]
         sol = evolutionary_algorithm(
             starting_population,
-            dominant_solution_breed_swap_employees,
-            mutation,
-            select_children,
-            100
+            breed_function="dominance_hierarchy_functions.dominant_solution_breed_swap_employees",
+            mutate_function="lukasz_function.mutation",
+            select_function="example_function_file.select_children",
+            no_generations=100,
         )
         for i, x in enumerate(evaluation_fn(T, Z, p, sol.R)):
             best_effort_results[i].append(x)
 
+    rng = np.random.default_rng(seed)
     for _ in tqdm(range(N)):
-        tasks = generate_tasks(num_tasks)
-        T, Z, p = generate_input_matrices(employees, tasks)
+        T, Z, p = generate_instance(num_tasks, employees=employees, seed=rng)
         run(T, Z, p)
 
     fig, axes = plt.subplots(2, 3, figsize=(24, 16))
@@ -1,6 +1,9 @@
 import random
 import math
-from genetic_algorithm import Solution
+
+import numpy as np
+
+from genetic_algorithm import Solution, evaluate_population, without_duplicates
 
 def add_mutate(children):
     def find_not_assigned_tasks(child):
@@ -57,9 +60,12 @@ def delete_longest_task(children: list[Solution]):
             child.R[emp][idx] = 0
     return children
 
-
-defined_functions = {
-    "breed": [],
-    "mutate": [add_mutate, delete_disliked_mutate, delete_longest_task, delete_lowest_priority],
-    "select": [],
-}
\ No newline at end of file
+def tournament_select(population, children, tournament_size=3):
+    # Every survivor is the best of `tournament_size` individuals of population + children drawn at random
+    # (with replacement), all tournaments at once on the fitness array; no sorting. A strong individual
+    # can win several tournaments and then appears several times (operators copy parents before changing them).
+    combined = population + children
+    fs = without_duplicates(combined, evaluate_population(combined)[:, 4])
+    contestants = np.random.randint(0, len(combined), (len(population), tournament_size))
+    winners = contestants[np.arange(len(population)), np.argmin(fs[contestants], axis=1)]
+    return [combined[i] for i in winners]
@@ -1,12 +1,9 @@
 import random
-import copy
-from genetic_algorithm import Solution
 
 
 def random_delete_breed(population):
     def create_child(parent1, parent2):
-        # child = Solution(copy(parent1.R))
-        child = Solution(copy.deepcopy(parent1.R))
+        child = parent1.copy()
 
         for employee in range(len(parent1.R)):
             for task in range(len(parent1.R[0])):
@@ -46,10 +43,3 @@ def random_delete_mutation(children):
 
 def select_children(population, children):
     return children
-
-
-defined_functions = {
-    "breed": [random_delete_breed],
-    "mutate": [random_delete_mutation],
-    "select": [select_children],
-}
\ No newline at end of file
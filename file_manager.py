@@ -1,54 +1,26 @@
-import inspect
+import atexit
 import json
+import pickle
 from pathlib import Path
 import os
+import threading
 import time
 from uuid import uuid1
 
-from dominance_hierarchy_functions import (
-    defined_functions as dominance_hierarchy_functions,
-)
-from evolutionary_functions import defined_functions as evolutionary_functions
-from example_function_file import defined_functions as example_functions
-from genetic_algorithm import Solution
-from lukasz_function import defined_functions as lukasz_functions
-from maciek_function_file import defined_functions_maciek as maciek_functions
+import numpy as np
+
+import kernels
+from genetic_algorithm import TERMINATION_CRITERIA, Solution, fingerprint
+from islands import ISLAND_DEFAULTS, TOPOLOGIES
+from operators import KINDS, get_operator
+from profiling import hooks_from_config
+from repair import set_default_drop_policy
+from seeding import STRATEGIES, seed_population
+from solution_log import SOLUTIONS_LOG_FORMATS, encode_header, encode_index_entry, encode_record
 from taskplanner import solve
-from taskplanner import Employee, Task, generate_input_matrices, generate_tasks, generate_employees
-
-
-
-def get_function_names_dict():
-    category_function_names_dict = {
-        "breed_function": [
-            *example_functions["breed"],
-            *evolutionary_functions["breed"],
-            *dominance_hierarchy_functions["breed"],
-            *lukasz_functions["breed"],
-            *maciek_functions["breed"],
-        ],
-        "mutate_function": [
-            *example_functions["mutate"],
-            *evolutionary_functions["mutate"],
-            *dominance_hierarchy_functions["mutate"],
-            *lukasz_functions["mutate"],
-            *maciek_functions["mutate"],
-        ],
-        "select_function": [
-            *example_functions["select"],
-            *evolutionary_functions["select"],
-            *dominance_hierarchy_functions["select"],
-            *lukasz_functions["select"],
-            *maciek_functions["select"],
-        ],
-    }
-    return {
-        category: {
-            func.__name__: f"{inspect.getmodule(func).__name__}.{func.__name__}"
-            for func in funcs
-        }
-        for category, funcs in category_function_names_dict.items()
-    }
+from taskplanner import Employee, Task, generate_input_matrices, generate_instance
+
+
 
 class FileManager():
 
@@ -68,7 +40,7 @@ class FileManager():
         - `no_generations`: number of generations to run the algorithm
         - `starting_population_mode`: strategy for initializing the population; either `"auto"` or `"from_file"`
             * `"auto"` - requires an additional field `starting_population_size` with an integer specifying how many individuals should be generated
-            * `"from_file"` - requires an additional field `starting_population_file` with the name of a JSON file (in the experiment directory) containing a list of `R` matrices to be used as the initial population
+            * `"from_file"` - requires an additional field `starting_population_file` with the name of a JSON file (in the experiment directory) containing a list of `R` matrices (or assignment vectors, see `R_to_assignment`) to be used as the initial population
         - `breed_function`: name of the breeding function to use
         - `mutate_function`: name of the mutation function to use
         - `select_function`: name of the selection function to use
@@ -89,7 +61,53 @@ class FileManager():
                     * `difficulty` - integer indicating how difficult the task is (the higher, the more difficult)
                     * `category` - category ID of the task
                     * `priority` - integer from 0 to 10 (the higher, the more important the task)
-            * `"auto"` - requires fileds `"num_tasks"` and `"num_employees"` to be provided as positive integers. Mock data will be automatically generated based on these counts.
+            * `"npy"` - requires files `T.npy`, `Z.npy` and `p.npy` (see `convert_matrices.py`), which are memory-mapped instead of parsed;
+              worker processes map the same files, so the pages are shared.
+            * `"auto"` - requires fileds `"num_tasks"` and `"num_employees"` to be provided as positive integers. Mock data will be automatically generated based on these counts
+              (see `taskplanner.generate_instance`); the optional integer field `"instance_seed"` makes it reproducible.
+
+        With `starting_population_mode` `"auto"`, the optional field `starting_population_seeding` builds the population
+        with `seeding.seed_population` instead of `taskplanner.solve`: an object with weights of the strategies `"random"`,
+        `"ratio"`, `"satisfaction"` and `"regret"`, e.g. `{"random": 0.5, "ratio": 0.25, "regret": 0.25}`.
+
+        The optional field `workers` (default 1) sets how many processes breed, mutate and evaluate children
+        in parallel (see `parallel.ParallelPipeline`).
+
+        The optional field `islands` switches to the island model (see `islands.island_model`). It is an object with
+        `count` (number of islands, ≥ 2) and optionally `migration_interval`, `migration_size`, `topology`
+        (`"ring"` or `"fully_connected"`) and `functions` (list of objects with `breed_function`, `mutate_function`
+        and/or `select_function` names, used by consecutive islands).
+
+        The optional field `repair_drop_policy` selects which tasks the repair step (see `repair.repair_population`)
+        drops first from over-budget employees: `"shortest_first"` (default), `"lowest_priority"` or `"lowest_satisfaction"`.
+
+        The optional field `buffered_logging` (used by `Logger`) makes the logger keep records in memory and write them
+        from a background thread (see `BufferedWriter`). It is `true` or an object with `flush_size` (records, default 100)
+        and/or `flush_interval` (seconds, default 1.0).
+
+        The optional field `solutions_log_format` (used by `Logger`) is `"json"` (default, the best R of every generation
+        in `solutions.txt`) or `"binary"` (`solutions.bin` and `solutions.idx`, written only when the best solution changes,
+        read with `solution_log.SolutionLog`).
+
+        The optional field `checkpoint_interval` (used by `Logger`, not with `islands`) saves a checkpoint
+        of the run to the log directory every that many generations (see `Logger.save_checkpoint`). In `"generated"`
+        and `"auto"` mode T, Z and p are saved to `problem.npz` in the log directory as well and read from there on resume.
+
+        The optional field `termination` (not with `islands`) adds stop conditions to `no_generations`: an object with any of
+        `stagnation_generations` and `stagnation_epsilon`, `time_limit` (seconds), `max_evaluations` and `target_f`
+        (see `genetic_algorithm.Termination`). `Logger` writes the reason of stopping to `termination.json`.
+
+        The optional field `profiling` (used by `Logger`, not with `islands`) attaches hooks from `profiling.py`: `timing` (bool)
+        adds the time of every phase, fitness evaluations and `is_legal` calls per generation to `results.csv` and a summary to
+        `profile_summary.json`; `cprofile` and `tracemalloc` (`[first, last]` generation range) write `profile.prof` and `tracemalloc.txt`.
+
+        The optional field `fitness_cache_size` (default 0, off) keeps the fitness of that many recently evaluated solutions
+        by their content hash (see `genetic_algorithm.FitnessCache`), so a solution equal to one already seen is not evaluated again.
+        The optional field `deduplicate` (default `false`) makes the selections prefer distinct solutions: individuals equal to one
+        already selected are taken only when there are not enough distinct ones (see `genetic_algorithm.without_duplicates`).
+
+        The optional field `kernel_backend` is `"auto"` (default: compiled kernels when numba is installed), `"numba"`
+        or `"numpy"` (see `kernels.py`); both give the same results.
 
         If the optional field `save_matrices` is included in the configuration, the files `T.json`, `Z.json`, `p.json`, and `starting_population.json` will be saved inside the log directory. These files can be used to replicate the experiment or to test other methods on the same data.
 
@@ -116,8 +134,34 @@ class FileManager():
 
         self._validate_L(data)
 
+        self._validate_workers(data)
+
+        self._validate_islands(data)
+
+        self._validate_buffered_logging(data)
+
+        self._validate_checkpoint_interval(data)
+
+        self._validate_termination(data)
+
+        self._validate_profiling(data)
+
+        self._validate_fitness_cache(data)
+
+        if data.get("solutions_log_format", "json") not in SOLUTIONS_LOG_FORMATS:
+            raise ValueError(
+                f"Unexpected value of solutions_log_format: {data["solutions_log_format"]}. "
+                f"Expected: {', '.join(SOLUTIONS_LOG_FORMATS)}"
+            )
+
         self._validate_data_load_mode(data)
 
+        if "repair_drop_policy" in data.keys():
+            set_default_drop_policy(data["repair_drop_policy"])
+
+        if "kernel_backend" in data.keys():
+            kernels.set_backend(data["kernel_backend"])
+
         self.load_data()
 
         self.L = data["L"]
@@ -135,6 +179,8 @@ class FileManager():
             data["beta"],
             data["gamma"],
             data["delta"],
+            fitness_cache_size=data.get("fitness_cache_size", 0),
+            deduplicate=data.get("deduplicate", False),
         )
 
         self._starting_population_logic(verbose, data)
@@ -142,26 +188,27 @@ class FileManager():
         self.validate_and_transform_function_names(data)
 
     def validate_and_transform_function_names(self, data):
-        function_names_dict = get_function_names_dict()
-        self.breed_function_fqn = function_names_dict["breed_function"].get(data["breed_function"])
-        self.mutate_function_fqn = function_names_dict["mutate_function"].get(data["mutate_function"])
-        self.select_function_fqn = function_names_dict["select_function"].get(data["select_function"])
+        # names of the registered operators (see operators.py) to their fqn, no operator module is imported
+        self.breed_function_fqn = get_operator(data["breed_function"], "breed").fqn
+        self.mutate_function_fqn = get_operator(data["mutate_function"], "mutate").fqn
+        self.select_function_fqn = get_operator(data["select_function"], "select").fqn
+
+        self.islands = None
+        if "islands" in data.keys():
+            self.islands = {**ISLAND_DEFAULTS, **data["islands"]}
+            self.islands["functions"] = [
+                {category: self._function_fqn(category, name) for category, name in functions.items()}
+                for functions in data["islands"].get("functions", [])
+            ]
 
-        if self.breed_function_fqn is None:
-            raise ValueError(
-                f"Cannot find function {data["breed_function"]}. "
-                f"Try one of: {', '.join(function_names_dict["breed_function"].keys())}"
-            )
-        if self.mutate_function_fqn is None:
+    def _function_fqn(self, category, name):
+        categories = [f"{kind}_function" for kind in KINDS]
+        if category not in categories:
             raise ValueError(
-                f"Cannot find function {data["mutate_function"]}. "
-                f"Try one of: {', '.join(function_names_dict["mutate_function"].keys())}"
-            )
-        if self.select_function_fqn is None:
-            raise ValueError(
-                f"Cannot find function {data["select_function"]}. "
-                f"Try one of: {', '.join(function_names_dict["select_function"].keys())}"
+                f"Unexpected key {category} in island functions. "
+                f"Expected: {', '.join(categories)}"
             )
+        return get_operator(name, category.removesuffix("_function")).fqn
 
     def _starting_population_logic(self, verbose, data):
         if data["starting_population_mode"] not in ("auto", "from_file"):
@@ -179,10 +226,19 @@ class FileManager():
             ):
                 raise ValueError("'starting_population_size' must be an integer ≥ 2.")
             
-            self.starting_population = [
-                Solution(solve(*Solution.get_data_and_config()))
-                for _ in range(data["starting_population_size"])
-            ]
+            if "starting_population_seeding" in data.keys():
+                if not isinstance(data["starting_population_seeding"], dict):
+                    raise ValueError(
+                        f"'starting_population_seeding' must be an object with weights of: {', '.join(STRATEGIES)}"
+                    )
+                self.starting_population = seed_population(
+                    data["starting_population_size"], data["starting_population_seeding"]
+                )
+            else:
+                self.starting_population = [
+                    Solution(solve(*Solution.get_data_and_config())).compact()
+                    for _ in range(data["starting_population_size"])
+                ]
             if verbose:
                 print("Number of individuals in the initial population: "
                     f"{len(self.starting_population)}.")
@@ -209,10 +265,10 @@ class FileManager():
                 )
 
     def _validate_data_load_mode(self, data):
-        if data["data_load_mode"] not in ("matrices", "generated", "auto"):
+        if data["data_load_mode"] not in ("matrices", "npy", "generated", "auto"):
             raise ValueError(
                 "Unexpected value of 'data_load_mode':"
-                f"{data["data_load_mode"]}. Expected: 'matrices', 'generated' or 'auto'"
+                f"{data["data_load_mode"]}. Expected: 'matrices', 'npy', 'generated' or 'auto'"
                 )
         
         if data["data_load_mode"] == "auto" and (
@@ -233,6 +289,9 @@ class FileManager():
                 f"In 'auto' mode, you must provide a 'num_tasks' field with a positive integer value."
             )
 
+        if "instance_seed" in data.keys() and (not isinstance(data["instance_seed"], int) or data["instance_seed"] < 0):
+            raise ValueError("instance_seed must be integer ≥ 0")
+
 
     def _validate_required_fields(self, filename, data, required_fields):
         for required_field in required_fields:
@@ -242,6 +301,93 @@ class FileManager():
                     f"in configuration file {filename}"
                     )
 
+    def _validate_islands(self, data):
+        if "islands" not in data.keys():
+            return
+        islands = data["islands"]
+        if not isinstance(islands, dict) or not isinstance(islands.get("count"), int) or islands["count"] < 2:
+            raise ValueError("'islands' must be an object with an integer 'count' ≥ 2.")
+        if not isinstance(islands.get("migration_interval", 1), int) or islands.get("migration_interval", 1) <= 0:
+            raise ValueError("'migration_interval' of islands must be integer > 0")
+        if not isinstance(islands.get("migration_size", 0), int) or islands.get("migration_size", 0) < 0:
+            raise ValueError("'migration_size' of islands must be integer ≥ 0")
+        if islands.get("topology", "ring") not in TOPOLOGIES:
+            raise ValueError(
+                f"Unexpected value of islands 'topology': {islands["topology"]}. "
+                f"Expected: {', '.join(TOPOLOGIES)}"
+            )
+        if not isinstance(islands.get("functions", []), list) or not all(isinstance(f, dict) for f in islands.get("functions", [])):
+            raise ValueError("'functions' of islands must be a list of objects")
+
+    def _validate_buffered_logging(self, data):
+        buffered_logging = data.get("buffered_logging", False)
+        if isinstance(buffered_logging, bool):
+            return
+        if not isinstance(buffered_logging, dict) or set(buffered_logging.keys()) - {"flush_size", "flush_interval"}:
+            raise ValueError("'buffered_logging' must be a boolean or an object with 'flush_size' and/or 'flush_interval'")
+        if not isinstance(buffered_logging.get("flush_size", 1), int) or buffered_logging.get("flush_size", 1) <= 0:
+            raise ValueError("'flush_size' of buffered_logging must be integer > 0")
+        if not isinstance(buffered_logging.get("flush_interval", 1), (int, float)) or buffered_logging.get("flush_interval", 1) <= 0:
+            raise ValueError("'flush_interval' of buffered_logging must be a number > 0")
+
+    def _validate_checkpoint_interval(self, data):
+        if "checkpoint_interval" not in data.keys():
+            return
+        if not isinstance(data["checkpoint_interval"], int) or data["checkpoint_interval"] <= 0:
+            raise ValueError("checkpoint_interval must be integer > 0")
+        if "islands" in data.keys():
+            raise ValueError("checkpoint_interval cannot be used with islands")
+
+    def _validate_termination(self, data):
+        if "termination" not in data.keys():
+            return
+        termination = data["termination"]
+        if not isinstance(termination, dict) or set(termination.keys()) - set(TERMINATION_CRITERIA):
+            raise ValueError(f"'termination' must be an object with fields: {', '.join(TERMINATION_CRITERIA)}")
+        if "islands" in data.keys():
+            raise ValueError("termination cannot be used with islands")
+        for key in ("stagnation_generations", "max_evaluations"):
+            if key in termination and (not isinstance(termination[key], int) or termination[key] <= 0):
+                raise ValueError(f"'{key}' of termination must be integer > 0")
+        if "stagnation_epsilon" in termination and (
+            not isinstance(termination["stagnation_epsilon"], (int, float)) or termination["stagnation_epsilon"] < 0
+        ):
+            raise ValueError("'stagnation_epsilon' of termination must be a number ≥ 0")
+        if "time_limit" in termination and (not isinstance(termination["time_limit"], (int, float)) or termination["time_limit"] <= 0):
+            raise ValueError("'time_limit' of termination must be a number > 0")
+        if "target_f" in termination and not isinstance(termination["target_f"], (int, float)):
+            raise ValueError("'target_f' of termination must be a number")
+
+    def _validate_profiling(self, data):
+        if "profiling" not in data.keys():
+            return
+        profiling = data["profiling"]
+        if not isinstance(profiling, dict) or set(profiling.keys()) - {"timing", "cprofile", "tracemalloc"}:
+            raise ValueError("'profiling' must be an object with fields: timing, cprofile, tracemalloc")
+        if "islands" in data.keys():
+            raise ValueError("profiling cannot be used with islands")
+        if not isinstance(profiling.get("timing", False), bool):
+            raise ValueError("'timing' of profiling must be a boolean")
+        for key in ("cprofile", "tracemalloc"):
+            generations = profiling.get(key, [0, 0])
+            if (
+                not isinstance(generations, list) or len(generations) != 2
+                or not all(isinstance(g, int) for g in generations) or not 0 <= generations[0] <= generations[1]
+            ):
+                raise ValueError(f"'{key}' of profiling must be a range of generations [first, last]")
+
+    def _validate_fitness_cache(self, data):
+        if "fitness_cache_size" in data.keys() and (not isinstance(data["fitness_cache_size"], int) or data["fitness_cache_size"] < 0):
+            raise ValueError("fitness_cache_size must be integer >= 0")
+        if not isinstance(data.get("deduplicate", False), bool):
+            raise ValueError("deduplicate must be a boolean")
+
+    def _validate_workers(self, data):
+        if "workers" in data.keys() and (not isinstance(data["workers"], int) or data["workers"] <= 0):
+            raise ValueError(
+                "workers must be integer > 0"
+            )
+
     def _validate_L(self, data):
         if not isinstance(data["L"], int) or data["L"] <= 0:
             raise ValueError(
@@ -255,13 +401,19 @@ class FileManager():
             "mutate_function": self.mutate_function_fqn,
             "select_function": self.select_function_fqn,
             "no_generations": self.data["no_generations"],
+            "workers": self.data.get("workers", 1),
+            "islands": self.islands,
+            "checkpoint_interval": self.data.get("checkpoint_interval"),
+            "termination": self.data.get("termination"),
         }
 
     def load_data(self):
         if self.data["data_load_mode"] == "generated":
             self._load_tasks_employees()
         elif self.data["data_load_mode"] == "auto":
-            self._generate_data(self.data["num_tasks"], self.data["num_employees"])
+            self._generate_data(self.data["num_tasks"], self.data["num_employees"], self.data.get("instance_seed"))
+        elif self.data["data_load_mode"] == "npy":
+            self._load_T_Z_p_npy()
         else: # "data_load_mode" = "matrices"
             self._load_T_Z_p()
 
@@ -276,11 +428,18 @@ class FileManager():
         self.Z = self.load_matrix_from_json("Z.json")
         self.p = self.load_matrix_from_json("p.json")
 
-    def _generate_data(self, num_tasks, num_employees):
-        tasks = generate_tasks(num_tasks)
-        employees = generate_employees(num_employees)
+    def _load_T_Z_p_npy(self):
+        self.T = self.load_matrix_from_npy("T.npy")
+        self.Z = self.load_matrix_from_npy("Z.npy")
+        self.p = self.load_matrix_from_npy("p.npy")
 
-        self.T, self.Z, self.p = generate_input_matrices(employees, tasks)
+    def convert_matrices_to_npy(self):
+        # writes T.npy, Z.npy and p.npy next to T.json, Z.json and p.json of the experiment directory
+        for name in ("T", "Z", "p"):
+            self.save_matrix_to_npy(f"{name}.npy", self.load_matrix_from_json(f"{name}.json"))
+
+    def _generate_data(self, num_tasks, num_employees, seed=None):
+        self.T, self.Z, self.p = generate_instance(num_tasks, num_employees, seed=seed)
 
     def _validate_task(self, task_dict):
         if not (0 <= int(task_dict["priority"]) <= 10):
@@ -351,25 +510,150 @@ class FileManager():
 
         return matrix
 
+    def load_matrix_from_npy(self, filename):
+        # read-only memory map: the file is paged in on access and its pages are shared between processes
+        matrix = np.load(self.experiment_catalog / filename, mmap_mode="r")
+        if matrix.dtype.kind not in "iuf":
+            raise ValueError(f"{filename} must contain a numeric matrix, got dtype {matrix.dtype}")
+        return matrix
+
+    def save_matrix_to_npy(self, filename, matrix):
+        np.save(self.experiment_catalog / filename, np.asarray(matrix))
+
     def save_matrix_to_json(self, filename, matrix, flag="w"):
+        if isinstance(matrix, np.ndarray):
+            matrix = matrix.tolist()
         with open(self.experiment_catalog / filename, flag) as f:
             json.dump(matrix, f)
             f.write('\n')
 
-    def save_solutions_to_json(self, filename, solutions: list[Solution], flag="w"):
-        Rs = [sol.R for sol in solutions]
+    def save_solutions_to_json(self, filename, solutions: list[Solution], flag="w", as_assignment=False):
+        # as_assignment=True stores each solution as its assignment vector instead of the full R
+        if as_assignment:
+            Rs = [sol.assignment.tolist() for sol in solutions]
+        else:
+            Rs = [sol.to_array().tolist() for sol in solutions]
         with open(self.experiment_catalog / filename, flag) as f:
             json.dump(Rs, f)
 
     def load_solutions_from_json(self, filename):
+        # accepts both R matrices and assignment vectors (see save_solutions_to_json)
         with open(self.experiment_catalog / filename, 'r') as f:
             Rs = json.load(f)
-        return [Solution(R) for R in Rs]
+        return [
+            Solution(R) if R and isinstance(R[0], list) else Solution(assignment=R)
+            for R in Rs
+        ]
+
+class BufferedWriter():
+    """
+    Appends records to files from a background thread. A record is a string or bytes, or a function returning one
+    (called on the writer thread, so e.g. JSON encoding does not slow down the caller).
+    Records wait in memory until `flush_size` of them are queued or `flush_interval` seconds have passed,
+    and are always written by `flush` and `close`. `close` is also registered to run at interpreter exit.
+    An error of the writer thread is raised by the next `write`, `flush` or `close`.
+    """
+    def __init__(self, flush_size=100, flush_interval=1.0):
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self._records = []
+        self._submitted = 0
+        self._written = 0
+        self._flush_requested = False
+        self._closed = False
+        self._error = None
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="BufferedWriter", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def write(self, path, record):
+        with self._condition:
+            self._raise_error()
+            if self._closed:
+                raise ValueError("BufferedWriter is closed")
+            self._records.append((path, record))
+            self._submitted += 1
+            if len(self._records) >= self.flush_size:
+                self._condition.notify_all()
+
+    def flush(self):
+        with self._condition:
+            submitted = self._submitted
+            self._flush_requested = True
+            self._condition.notify_all()
+            self._condition.wait_for(lambda: self._written >= submitted or self._error is not None)
+            self._raise_error()
+
+    def close(self):
+        with self._condition:
+            already_closed = self._closed
+            self._closed = True
+            self._condition.notify_all()
+        if not already_closed:
+            self._thread.join()
+            atexit.unregister(self.close)
+        with self._condition:
+            self._raise_error()
+
+    def _raise_error(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def _run(self):
+        files = {}
+        try:
+            while True:
+                with self._condition:
+                    self._condition.wait_for(
+                        lambda: self._closed or self._flush_requested or len(self._records) >= self.flush_size,
+                        timeout=self.flush_interval,
+                    )
+                    records, self._records = self._records, []
+                    self._flush_requested = False
+                    closed = self._closed
+
+                for path, record in records:
+                    data = record() if callable(record) else record
+                    if path not in files:
+                        files[path] = open(path, "ab" if isinstance(data, bytes) else "a")
+                    files[path].write(data)
+                for file in files.values():
+                    file.flush()
+
+                with self._condition:
+                    self._written += len(records)
+                    self._condition.notify_all()
+                    if closed and not self._records:
+                        return
+        except Exception as error:
+            with self._condition:
+                self._error = error
+                self._condition.notify_all()
+        finally:
+            for file in files.values():
+                file.close()
+
 
 class Logger(FileManager):
-    def __init__(self, catalog='data_files', experiment_results_catalog=None):
+    LOG_FILES = (
+        "solutions.txt", "results.csv", "islands.csv", "solutions.bin", "solutions.idx", "termination.json", "profile_summary.json",
+    )
+    CHECKPOINT_FILE = "checkpoint.pkl"
+    PROBLEM_FILE = "problem.npz"
+
+    def __init__(self, catalog='data_files', experiment_results_catalog=None, resume=False):
+        # resume=True reuses the existing log directory `experiment_results_catalog` (see load_checkpoint)
         super().__init__(catalog)
-        if experiment_results_catalog is None:
+        self.resume = resume
+        if resume:
+            if experiment_results_catalog is None or not os.path.isfile(
+                self.experiment_catalog / experiment_results_catalog / self.CHECKPOINT_FILE
+            ):
+                raise ValueError(f"No checkpoint to resume from in {self.experiment_catalog / str(experiment_results_catalog)}")
+            self.experiment_results_catalog = experiment_results_catalog
+        elif experiment_results_catalog is None:
             self.experiment_results_catalog = self._get_next_catalog()
         elif os.path.isdir(self.experiment_catalog / experiment_results_catalog):
             self.experiment_results_catalog = self._get_next_catalog()
@@ -379,9 +663,15 @@ class Logger(FileManager):
 
         self.experiment_results_full_path = self.experiment_catalog / self.experiment_results_catalog
 
-        os.makedirs(self.experiment_results_full_path)
+        os.makedirs(self.experiment_results_full_path, exist_ok=resume)
         self.iter_number = 0
         self.time_of_start = time.time()
+        self.writer = None
+        self._islands_logged = False
+        self.solutions_log_format = "json"
+        self._last_R = None
+        self._last_R_json = None
+        self._solutions_log_size = 0
 
         print(f"Logs available in directory: {self.experiment_results_full_path}")
 
@@ -391,30 +681,197 @@ class Logger(FileManager):
     def init_time_of_start(self, time):
         self.time_of_start = time
 
-    def log_iteration(self, solution: Solution, fs: list[float], time: int):
-        self.save_matrix_to_json(
-            self.experiment_results_full_path / "solutions.txt",
-            solution.R,
-            flag = "a"
-        )
+    def enable_buffering(self, flush_size=100, flush_interval=1.0):
+        if self.writer is None:
+            self.writer = BufferedWriter(flush_size, flush_interval)
+
+    def flush(self):
+        if self.writer:
+            self.writer.flush()
+
+    def close(self):
+        if self.writer:
+            self.writer.close()
+            self.writer = None
+
+    def _append(self, filename, record):
+        path = self.experiment_results_full_path / filename
+        if self.writer:
+            self.writer.write(path, record)
+        else:
+            data = record() if callable(record) else record
+            with open(path, "ab" if isinstance(data, bytes) else "a") as f:
+                f.write(data)
+
+    def _dump_R(self, R):
+        self._last_R_json = json.dumps(R.tolist()) + "\n"
+        return self._last_R_json
+
+    def _log_solution_json(self, R):
+        # The best solution rarely changes between generations: its JSON line is then reused.
+        # Encoding happens in the record function, on the writer thread when buffered
+        # (records are written in order, so _last_R_json belongs to _last_R by then).
+        if self._last_R is None or not np.array_equal(R, self._last_R):
+            self._last_R = R
+            self._append("solutions.txt", lambda: self._dump_R(R))
+        else:
+            self._append("solutions.txt", lambda: self._last_R_json)
+
+    def _log_solution_binary(self, R):
+        if self._last_R is not None and np.array_equal(R, self._last_R):
+            return
+        self._last_R = R
+        if self._solutions_log_size == 0:
+            header = encode_header(*R.shape)
+            self._append("solutions.bin", header)
+            self._solutions_log_size = len(header)
+        record = encode_record(self.iter_number, R)
+        self._append("solutions.bin", record)
+        self._append("solutions.idx", encode_index_entry(self.iter_number, self._solutions_log_size))
+        self._solutions_log_size += len(record)
+
+    def log_iteration(self, solution: Solution, fs: list[float], time: int, columns=None):
+        # columns: extra results.csv columns (e.g. of profiling.PhaseTimer), the same in every iteration
+        if self.solutions_log_format == "binary":
+            self._log_solution_binary(solution.to_array())
+        else:
+            self._log_solution_json(solution.to_array())
+
         csv_headers = ["iteration", "time_from_start", "f1", "f2", "f3", "f4", "f"]
-        headers_str = ",".join(csv_headers)
         csv_values = [self.iter_number, time-self.time_of_start] + list(fs)
         values_str = ",".join(f"{v:.3f}" for v in csv_values)
-        with open(self.experiment_results_full_path / "results.csv", "a") as results:
-            if self.iter_number == 0:
-                results.write(headers_str+"\n")
-            results.write(values_str+"\n")
+        if columns:
+            csv_headers += list(columns.keys())
+            values_str += "," + ",".join(f"{v:.6f}" if isinstance(v, float) else str(v) for v in columns.values())
+        values_str += "\n"
+        if self.iter_number == 0:
+            values_str = ",".join(csv_headers) + "\n" + values_str
+        self._append("results.csv", values_str)
         self.iter_number += 1
 
+    def save_checkpoint(self, run):
+        """
+        Saves `run` (a `genetic_algorithm.EvolutionRun`: population with ages, best solution, generation
+        and RNG states) with the logger counters and the current sizes of the log files to `checkpoint.pkl`
+        in the log directory, replacing the previous checkpoint atomically.
+        """
+        self.flush()
+        log_sizes = {
+            filename: os.path.getsize(self.experiment_results_full_path / filename)
+            for filename in self.LOG_FILES
+            if os.path.exists(self.experiment_results_full_path / filename)
+        }
+        checkpoint = {
+            "run": run,
+            "problem": fingerprint(Solution.T_array, Solution.Z_array, Solution.p_array, np.array(Solution.L)),
+            "logger": {
+                "iter_number": self.iter_number,
+                "time_from_start": time.time() - self.time_of_start,
+                "islands_logged": self._islands_logged,
+                "last_R": self._last_R,
+                "last_R_json": self._last_R_json,
+                "solutions_log_size": self._solutions_log_size,
+                "log_sizes": log_sizes,
+            },
+        }
+        path = self.experiment_results_full_path / self.CHECKPOINT_FILE
+        with open(f"{path}.tmp", "wb") as f:
+            pickle.dump(checkpoint, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(f"{path}.tmp", path)
+
+    def load_checkpoint(self):
+        """
+        Restores the logger from `checkpoint.pkl` (log files are truncated to their size at the checkpoint,
+        dropping records of generations after it) and returns the saved `EvolutionRun`,
+        to be passed as `resume` to `evolutionary_algorithm`. `load_config` must be called first.
+        """
+        with open(self.experiment_results_full_path / self.CHECKPOINT_FILE, "rb") as f:
+            checkpoint = pickle.load(f)
+        if checkpoint["problem"] != fingerprint(Solution.T_array, Solution.Z_array, Solution.p_array, np.array(Solution.L)):
+            raise ValueError("The checkpoint was saved for different T, Z, p or L than in the configuration")
+
+        state = checkpoint["logger"]
+        for filename in self.LOG_FILES:
+            path = self.experiment_results_full_path / filename
+            if filename in state["log_sizes"]:
+                os.truncate(path, state["log_sizes"][filename])
+            elif os.path.exists(path):
+                os.remove(path)
+        self.iter_number = state["iter_number"]
+        self.time_of_start = time.time() - state["time_from_start"]
+        self._islands_logged = state["islands_logged"]
+        self._last_R = state["last_R"]
+        self._last_R_json = state["last_R_json"]
+        self._solutions_log_size = state["solutions_log_size"]
+        return checkpoint["run"]
+
+    def log_termination(self, reason, generation, termination=None):
+        # termination.json: why and when the run stopped ("no_generations" if no criterion of `termination` did)
+        record = {"reason": reason, "generation": generation, "time_from_start": time.time() - self.time_of_start}
+        if termination is not None:
+            record["evaluations"] = termination.evaluations
+        self._append("termination.json", json.dumps(record) + "\n")
+
+    def log_profile_summary(self, summaries):
+        # summaries of profiling hooks by hook name, see EvolutionRun.close_hooks
+        self._append("profile_summary.json", json.dumps(summaries, indent=4) + "\n")
+        if "timing" in summaries:
+            timing = summaries["timing"]
+            print(f"Time per generation ({timing['generations']} generations):")
+            for phase, share in timing["time_share"].items():
+                print(f"  {phase:<10}{timing['per_generation'][f'{phase}_time'] * 1000:10.3f} ms {share:7.1%}")
+            print(f"  evaluations: {timing['per_generation']['evaluations']:.1f}, is_legal calls: {timing['per_generation']['is_legal_calls']:.1f}")
+
+    def get_evolutionary_algorithm_arguments(self):
+        arguments = super().get_evolutionary_algorithm_arguments()
+        arguments["hooks"] = hooks_from_config(self.data.get("profiling"), self.experiment_results_full_path)
+        return arguments
+
+    def log_islands(self, iteration, islands_fs):
+        csv_headers = ["iteration", "island", "f1", "f2", "f3", "f4", "f"]
+        lines = [",".join(f"{v:.3f}" for v in [iteration, island] + list(fs)) for island, fs in enumerate(islands_fs)]
+        if not self._islands_logged:
+            lines.insert(0, ",".join(csv_headers))
+            self._islands_logged = True
+        self._append("islands.csv", "\n".join(lines) + "\n")
+
     def load_config(self, filename="config.json", verbose=True):
         super().load_config(filename, verbose)
-        if "save_matrices" in self.data.keys():
+        self.solutions_log_format = self.data.get("solutions_log_format", "json")
+        buffered_logging = self.data.get("buffered_logging", False)
+        if buffered_logging:
+            self.enable_buffering(**(buffered_logging if isinstance(buffered_logging, dict) else {}))
+        if "save_matrices" in self.data.keys() and not self.resume:
             self._save_matrices()
+        if "checkpoint_interval" in self.data.keys() and not self.resume and self.data["data_load_mode"] in ("generated", "auto"):
+            self.save_problem()
+
+    def save_problem(self):
+        # T, Z and p drawn at random ("generated" and "auto" mode) for resuming, see load_data
+        np.savez(self.experiment_results_full_path / self.PROBLEM_FILE, T=self.T, Z=self.Z, p=self.p)
+
+    def load_data(self):
+        # A resumed run of "generated" or "auto" mode reads the matrices saved with the checkpoints
+        # instead of drawing a different instance, which the checkpoint would not match.
+        path = self.experiment_results_full_path / self.PROBLEM_FILE
+        if not (self.resume and os.path.isfile(path)):
+            return super().load_data()
+        with np.load(path) as problem:
+            self.T, self.Z, self.p = problem["T"], problem["Z"], problem["p"]
+        if self.data["data_load_mode"] == "generated":
+            # generate_input_matrices gives lists
+            self.T, self.Z, self.p = self.T.tolist(), self.Z.tolist(), self.p.tolist()
 
 
     def _save_matrices(self):
         self.save_solutions_to_json(f"{self.experiment_results_full_path}/starting_population.json", self.starting_population)
+        if self.data["data_load_mode"] == "npy":
+            self.save_matrix_to_npy(f"{self.experiment_results_full_path}/T.npy", self.T)
+            self.save_matrix_to_npy(f"{self.experiment_results_full_path}/Z.npy", self.Z)
+            self.save_matrix_to_npy(f"{self.experiment_results_full_path}/p.npy", self.p)
+            return
         self.save_matrix_to_json(f"{self.experiment_results_full_path}/T.json", self.T)
         self.save_matrix_to_json(f"{self.experiment_results_full_path}/Z.json", self.Z)
         self.save_matrix_to_json(f"{self.experiment_results_full_path}/p.json", self.p)
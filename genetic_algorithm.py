@@ -1,7 +1,12 @@
+import hashlib
 import importlib
-import inspect
+import kernels
 import numpy as np
+import random
 import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from operators import OPERATORS
 from tqdm import tqdm
 
 def get_evaluator_fn(alpha, beta, gamma, delta):
@@ -17,21 +22,505 @@ def get_evaluator_fn(alpha, beta, gamma, delta):
 
     return evaluate
 
+def get_batch_evaluator_fn(alpha, beta, gamma, delta):
+    # Same loss as get_evaluator_fn, but for a whole population at once:
+    # T, Z, p are numpy arrays and Rs is stacked as (individuals, employees, tasks).
+    # Returns an (individuals, 5) array of f1, f2, f3, f4, F.
+    # The per-employee sums come from the compiled kernel when available (see kernels.py).
+    def evaluate(T, Z, p, Rs, L=40):
+        if kernels.compiled(T, Z, p, Rs):
+            time_spent_per_employee, priority_time, satisfaction = kernels.employee_sums(T, Z, p, Rs)
+            f2 = np.sum(priority_time, axis=1)
+        else:
+            time_spent = T * Rs
+            time_spent_per_employee = np.sum(time_spent, axis=2)
+            f2 = np.sum(time_spent * (11 - p), axis=(1, 2))
+            satisfaction = np.sum(Z * Rs, axis=2)
+        return loss_from_sums(alpha, beta, gamma, delta, time_spent_per_employee, f2, satisfaction, L)
+
+    return evaluate
+
+def get_assignment_evaluator_fn(alpha, beta, gamma, delta):
+    # get_batch_evaluator_fn for (individuals, tasks) assignment vectors (see R_to_assignment) and integer T, Z, p:
+    # gathers and bincounts instead of a dense (individuals, employees, tasks) stack, so memory is O(individuals * tasks).
+    # Gives the same values as the dense evaluator (all sums are exact integers).
+    def evaluate(T, Z, p, assignments, L=40):
+        individuals, tasks = np.nonzero(assignments >= 0)
+        employees = assignments[individuals, tasks]
+        bins = individuals * len(T) + employees
+        shape = (len(assignments), len(T))
+
+        def per_employee(values):
+            sums = np.bincount(bins, weights=values, minlength=shape[0] * shape[1])
+            return sums.reshape(shape).astype(np.int64)
+
+        time_spent = T[employees, tasks]
+        time_spent_per_employee = per_employee(time_spent)
+        f2 = np.sum(per_employee(time_spent * (11 - p[tasks])), axis=1)
+        return loss_from_sums(alpha, beta, gamma, delta, time_spent_per_employee, f2, per_employee(Z[employees, tasks]), L)
+
+    return evaluate
+
+def loss_from_sums(alpha, beta, gamma, delta, time_spent_per_employee, f2, satisfaction, L):
+    # (individuals, 5) array of f1, f2, f3, f4, F from per-employee working time and satisfaction and f2
+    f1 = np.max(time_spent_per_employee, axis=1) - np.min(time_spent_per_employee, axis=1)
+    f3 = 1 / (1 + np.sum(np.sqrt(satisfaction), axis=1))
+    f4 = np.sum(L - time_spent_per_employee, axis=1)
+
+    return np.stack(
+        [alpha * f1, beta * f2, gamma * f3, delta * f4, alpha * f1 + beta * f2 + gamma * f3 + delta * f4],
+        axis=1,
+    )
+
+def fingerprint(*arrays):
+    digest = hashlib.sha256()
+    for array in arrays:
+        array = np.ascontiguousarray(array)
+        digest.update(f"{array.dtype.str}{array.shape}".encode())
+        digest.update(array.tobytes())
+    return digest.hexdigest()[:16]
+
+def hash_bytes(data):
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little")
+
+class FitnessCache():
+    """
+    Bounded map of solution content hash (see `Solution.content_hash`) to its (f1, f2, f3, f4, F).
+    When full, the least recently used entry is evicted. `hits` and `misses` count lookups.
+    """
+    def __init__(self, size):
+        self.size = size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        fitness = self.entries.get(key)
+        if fitness is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return fitness
+
+    def put(self, key, fitness):
+        self.entries[key] = fitness
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+    def fill(self, solutions):
+        # Sets the fitness of the solutions found in the cache, returns the others grouped by content hash.
+        missing = {}
+        for sol in solutions:
+            key = sol.content_hash()
+            fitness = self.get(key)
+            if fitness is None:
+                missing.setdefault(key, []).append(sol)
+            else:
+                sol._fitness = fitness
+        return missing
+
+def R_to_assignment(R):
+    # Compact form of R: assignment[task] is the index of the employee doing the task, or -1.
+    R = np.asarray(R)
+    if np.any((R != 0) & (R != 1)) or np.any(np.sum(R, axis=0) > 1):
+        raise ValueError("Only 0/1 matrices with at most one employee per task have an assignment vector")
+    return np.where(np.any(R, axis=0), np.argmax(R, axis=0), -1).astype(np.int32)
+
+def assignment_to_array(assignment, num_employees):
+    assignment = np.asarray(assignment)
+    R = np.zeros((num_employees, len(assignment)), dtype=int)
+    tasks = np.flatnonzero(assignment >= 0)
+    R[assignment[tasks], tasks] = 1
+    return R
+
+def assignment_to_R(assignment, num_employees):
+    return assignment_to_array(assignment, num_employees).tolist()
+
+def _fixed_shape(cls):
+    # R has the shape of the problem: methods adding or removing cells would leave the cached sums wrong
+    def refuse(name):
+        def method(self, *args, **kwargs):
+            raise TypeError(f"R has a fixed shape, {cls.__name__}.{name} is not supported")
+        method.__name__ = name
+        return method
+
+    for name in ("append", "extend", "insert", "pop", "remove", "clear", "__delitem__", "__iadd__", "__imul__"):
+        setattr(cls, name, refuse(name))
+    return cls
+
+
+@_fixed_shape
+class TrackedRow(list):
+    # Row `emp` of R that reports every write to its owning Solution, so the cached
+    # fitness and per-employee sums follow operators doing `child.R[emp][task] = ...`.
+    def __init__(self, row, owner, emp):
+        super().__init__(row)
+        self._owner = owner
+        self._emp = emp
+
+    def __setitem__(self, key, value):
+        if isinstance(key, slice):
+            super().__setitem__(key, value)
+            self._owner._invalidate()
+        else:
+            old = list.__getitem__(self, key)
+            super().__setitem__(key, value)
+            self._owner._cell_changed(self._emp, key, old, value)
+
+    # reordering keeps the shape, the cached sums are simply rebuilt
+    def reverse(self):
+        super().reverse()
+        self._owner._invalidate()
+
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self._owner._invalidate()
+
+    # copies and pickles are plain lists, they must not drag the owner along
+    def __copy__(self):
+        return list(self)
+
+    def __deepcopy__(self, memo):
+        return list(self)
+
+    def __reduce__(self):
+        return list, (list(self),)
+
+
+@_fixed_shape
+class TrackedMatrix(list):
+    # Outer list of R; rows assigned into it are copied into TrackedRows of the owner.
+    # The shape of R is fixed, so item assignment and reordering are tracked.
+    def __init__(self, R, owner):
+        super().__init__(TrackedRow(row, owner, emp) for emp, row in enumerate(R))
+        self._owner = owner
+
+    def __setitem__(self, key, value):
+        if isinstance(key, slice):
+            super().__setitem__(key, value)
+            for emp in range(len(self)):
+                list.__setitem__(self, emp, TrackedRow(list.__getitem__(self, emp), self._owner, emp))
+        else:
+            emp = range(len(self))[key]
+            super().__setitem__(key, TrackedRow(value, self._owner, emp))
+        self._owner._invalidate()
+
+    def _reindex(self):
+        # rows moved to other employees report their writes under the new index
+        for emp in range(len(self)):
+            list.__setitem__(self, emp, TrackedRow(list.__getitem__(self, emp), self._owner, emp))
+        self._owner._invalidate()
+
+    def reverse(self):
+        super().reverse()
+        self._reindex()
+
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self._reindex()
+
+    def __copy__(self):
+        return list(self)
+
+    def __deepcopy__(self, memo):
+        return [list(row) for row in self]
+
+    def __reduce__(self):
+        return list, ([list(row) for row in self],)
+
+
+class SolutionState():
+    # Everything derived from R that is queried over and over: per-employee working time,
+    # priority-weighted time and satisfaction (for the loss), per-task assignee counts and
+    # the number of violated constraints (for is_legal). Built once from R or the assignment
+    # vector, afterwards Solution._cell_changed keeps it up to date in O(1) per written cell.
+    def __init__(self, R, T, p, Z, L):
+        R = np.array(R)
+        time_spent = T * R
+        self.load = np.sum(time_spent, axis=1)
+        self.priority_time = np.sum(time_spent * (11 - p), axis=1)
+        self.satisfaction = np.sum(Z * R, axis=1)
+        self.assignees = np.sum(R, axis=0)
+
+        self.overloaded = int(np.sum((self.load < 0) | (self.load > L)))
+        self.conflicts = int(np.sum((self.assignees < 0) | (self.assignees > 1)))
+        self.invalid_cells = int(np.sum((R < 0) | (R > 1)))
+
+    @classmethod
+    def from_assignment(cls, assignment, T, p, Z, L):
+        # The same sums gathered from the assignment vector in O(n) instead of O(m*n) from R
+        # (integer data only, where the order of the additions does not matter).
+        state = object.__new__(cls)
+        tasks = np.flatnonzero(assignment >= 0)
+        employees = assignment[tasks]
+
+        def per_employee(values):
+            sums = np.bincount(employees, weights=values, minlength=len(T))
+            return sums.astype(np.result_type(values.dtype, np.int64))
+
+        time_spent = T[employees, tasks]
+        state.load = per_employee(time_spent)
+        state.priority_time = per_employee(time_spent * (11 - p[tasks]))
+        state.satisfaction = per_employee(Z[employees, tasks])
+        state.assignees = (assignment >= 0).astype(np.int64)
+
+        state.overloaded = int(np.sum((state.load < 0) | (state.load > L)))
+        state.conflicts = 0
+        state.invalid_cells = 0
+        return state
+
+    def copy(self):
+        state = object.__new__(SolutionState)
+        state.__dict__.update(self.__dict__)
+        for name in ("load", "priority_time", "satisfaction", "assignees"):
+            setattr(state, name, getattr(self, name).copy())
+        return state
+
+
 class Solution():
     T = Z = p = L = num_employees = num_tasks = None
+    static_legal = None
+    T_array = Z_array = p_array = None
     alpha = beta = gamma = delta = None
-    loss_function = None
-    def __init__(self, R, age=0):
+    loss_function = batch_loss_function = assignment_loss_function = None
+    integer_data = None
+    evaluations = 0  # fitness evaluations done in this process (cache misses)
+    is_legal_calls = 0
+    fitness_cache = None  # FitnessCache shared by all solutions, see initialize
+    deduplicate = False
+    def __init__(self, R=None, age=0, assignment=None):
+        # A solution is backed either by the matrix R or by the compact assignment vector
+        # (see R_to_assignment). An assignment-backed solution builds R on first access;
+        # assign/unassign/reassign keep the vector as long as every task has at most one employee.
         self.age = age
-        self.R = R
+        self._fitness = None
+        self._state = None
+        self._hash = None
+        self._assignment = None
+        if assignment is None:
+            self.R = R
+        else:
+            self.assignment = assignment
+        self.loss_function = self.__class__.loss_function
+
+    def __setattr__(self, name, value):
+        # R is always kept as a TrackedMatrix (rows are copied), so writes through
+        # `sol.R[emp][task] = ...` and `sol.R[emp] = row` keep the cached state right.
+        # Not a property: R is read in hot loops and should stay a plain attribute.
+        if name == "R":
+            value = TrackedMatrix(value, self)
+            self._assignment = None
+            self._invalidate()
+        super().__setattr__(name, value)
+
+    def __getattr__(self, name):
+        # only reached while R is not materialized yet
+        if name == "R" and self.__dict__.get("_assignment") is not None:
+            R = TrackedMatrix(assignment_to_R(self._assignment, self.num_employees), self)
+            self.__dict__["R"] = R
+            self.__dict__["_assignment"] = None
+            return R
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+    @property
+    def assignment(self):
+        if self._assignment is not None:
+            return self._assignment
+        return R_to_assignment(self.R)
+
+    @assignment.setter
+    def assignment(self, assignment):
+        if not (isinstance(assignment, np.ndarray) and assignment.dtype == np.int32 and not assignment.flags.writeable):
+            assignment = np.array(assignment, dtype=np.int32)
+            assignment.flags.writeable = False
+        self.__dict__.pop("R", None)
+        self._assignment = assignment
+        self._invalidate()
+
+    def compact(self):
+        # Switches to the assignment vector, dropping R (m times less memory, cheap to copy);
+        # raises ValueError if the solution has a task with more than one employee.
+        if self._assignment is None:
+            fitness, state, content_hash = self._fitness, self._state, self._hash
+            self.assignment = R_to_assignment(self.R)
+            self._fitness, self._state, self._hash = fitness, state, content_hash
+        return self
+
+    def copy(self, age=0):
+        # New solution with the same assignment, e.g. a child starting from its parent.
+        # This is the way operators should build children: the rows of R are copied with
+        # plain list copies (an assignment vector is read-only and simply shared) and the
+        # cached fitness and state are carried over, so no deepcopy and no re-evaluation.
+        # Solution(R), `sol.R = R` and `sol.R[emp] = row` copy the rows they get as well,
+        # so a row can be taken from another solution without copying it first.
+        # R keeps its shape: list methods adding or removing cells raise TypeError.
+        if self._assignment is not None:
+            child = Solution(assignment=self._assignment, age=age)
+        else:
+            child = Solution(self.R, age=age)
+        child._fitness = self._fitness
+        child._state = self._state.copy() if self._state is not None else None
+        child._hash = self._hash
+        return child
+
+    def content_hash(self):
+        # 64-bit hash of the assignment (of R when a task has several employees), equal for equal solutions
+        # whether they hold R or an assignment vector; cached until the solution changes.
+        if self._hash is None:
+            if self._assignment is not None:
+                data = self._assignment.tobytes()
+            else:
+                R = np.asarray(self.R)
+                try:
+                    data = R_to_assignment(R).tobytes()
+                except ValueError:
+                    data = b"R" + R.astype(np.int64).tobytes()
+            self._hash = hash_bytes(data)
+        return self._hash
+
+    def to_array(self):
+        if self._assignment is not None:
+            return assignment_to_array(self._assignment, self.num_employees)
+        return np.array(self.R)
+
+    def _invalidate(self):
+        self._fitness = None
+        self._state = None
+        self._hash = None
+
+    def _cell_changed(self, emp, task, old, new):
+        self._fitness = None
+        self._hash = None
+        state = self._state
+        if state is None or old == new:
+            return
+
+        change = new - old
+        L = self.L
+
+        load = state.load[emp]
+        state.load[emp] += self.T_array[emp, task] * change
+        state.overloaded += (not 0 <= state.load[emp] <= L) - (not 0 <= load <= L)
+        state.priority_time[emp] += self.T_array[emp, task] * (11 - self.p_array[task]) * change
+        state.satisfaction[emp] += self.Z_array[emp, task] * change
+
+        assignees = state.assignees[task]
+        state.assignees[task] += change
+        state.conflicts += (not 0 <= state.assignees[task] <= 1) - (not 0 <= assignees <= 1)
+
+        state.invalid_cells += (not 0 <= new <= 1) - (not 0 <= old <= 1)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        if "R" in state:
+            state["R"] = [list(row) for row in self.R]
+        del state["loss_function"]
+        return state
+
+    def __setstate__(self, state):
+        R = state.pop("R", None)
+        self.__dict__.update(state)
+        self.__dict__.setdefault("_hash", None)  # pickled before content hashes
+        if R is not None:
+            self.__dict__["R"] = TrackedMatrix(R, self)
         self.loss_function = self.__class__.loss_function
 
+    def _get_state(self):
+        if self._state is None and self._assignment is not None and self.integer_data:
+            self._state = SolutionState.from_assignment(
+                self._assignment, self.T_array, self.p_array, self.Z_array, self.L
+            )
+        if self._state is None:
+            self._state = SolutionState(self.to_array(), self.T_array, self.p_array, self.Z_array, self.L)
+        return self._state
+
+    def _fitness_from_sums(self, load, priority_time, satisfaction):
+        f1 = np.max(load) - np.min(load)
+        f2 = np.sum(priority_time)
+        f3 = 1 / (1 + np.sum(np.sqrt(satisfaction)))
+        f4 = np.sum(self.L - load)
+
+        return (
+            self.alpha * f1,
+            self.beta * f2,
+            self.gamma * f3,
+            self.delta * f4,
+            self.alpha * f1 + self.beta * f2 + self.gamma * f3 + self.delta * f4,
+        )
+
     @property
     def f(self):
-        return self.loss_function(self.T, self.Z, self.p, self.R, self.L)[4]
+        return self.get_detailed_f()[4]
     
     def get_detailed_f(self):
-        return self.loss_function(self.T, self.Z, self.p, self.R, self.L)
+        # O(m) from the incrementally kept state. The fitness cache is not used here: its key hashes
+        # the whole assignment, which would cost more than this; evaluate_population uses it.
+        if self._fitness is None:
+            state = self._get_state()
+            self._fitness = self._fitness_from_sums(state.load, state.priority_time, state.satisfaction)
+            Solution.evaluations += 1
+        return self._fitness
+
+    def assigned_employees(self, task):
+        if self._assignment is not None:
+            return [int(self._assignment[task])] if self._assignment[task] >= 0 else []
+        return [emp for emp in range(len(self.R)) if self.R[emp][task]]
+
+    def _set_assignee(self, task, emp):
+        # Move on the assignment vector without building R: the vector may be shared with
+        # copies of this solution, so it is copied before the write (O(n), not O(m*n)).
+        old = int(self._assignment[task])
+        assignment = self._assignment.copy()
+        assignment[task] = emp
+        assignment.flags.writeable = False
+        self._assignment = assignment
+        if old >= 0:
+            self._cell_changed(old, task, 1, 0)
+        if emp >= 0:
+            self._cell_changed(emp, task, 0, 1)
+
+    def assign(self, task, emp):
+        if self._assignment is not None:
+            if self._assignment[task] == emp:
+                return
+            if self._assignment[task] < 0:
+                self._set_assignee(task, emp)
+                return
+        # a second employee for the task needs R
+        self.R[emp][task] = 1
+
+    def unassign(self, task):
+        # returns the employees the task was taken from, so the move can be undone
+        employees = self.assigned_employees(task)
+        if self._assignment is not None:
+            if employees:
+                self._set_assignee(task, -1)
+            return employees
+        for emp in employees:
+            self.R[emp][task] = 0
+        return employees
+
+    def reassign(self, task, emp):
+        employees = self.unassign(task)
+        self.assign(task, emp)
+        return employees
+
+    def move_delta(self, task, emp=None):
+        # Change of F if `task` was moved to `emp` (or unassigned for None), without applying the move.
+        state = self._get_state()
+        load, priority_time, satisfaction = state.load.copy(), state.priority_time.copy(), state.satisfaction.copy()
+        for old_emp in self.assigned_employees(task):
+            load[old_emp] -= self.T_array[old_emp, task]
+            priority_time[old_emp] -= self.T_array[old_emp, task] * (11 - self.p_array[task])
+            satisfaction[old_emp] -= self.Z_array[old_emp, task]
+        if emp is not None:
+            load[emp] += self.T_array[emp, task]
+            priority_time[emp] += self.T_array[emp, task] * (11 - self.p_array[task])
+            satisfaction[emp] += self.Z_array[emp, task]
+
+        return self._fitness_from_sums(load, priority_time, satisfaction)[4] - self.f
     
     @classmethod
     def initialize(
@@ -46,6 +535,8 @@ class Solution():
         beta=1, 
         gamma=3000,
         delta=20,
+        fitness_cache_size=0,
+        deduplicate=False,
     ):
         cls.T = T
         cls.Z = Z
@@ -54,80 +545,416 @@ class Solution():
         cls.num_employees = num_employees
         cls.num_tasks = num_tasks
 
+        # asarray: arrays given here (e.g. views of shared memory in workers) are not copied
+        cls.T_array = np.asarray(T)
+        cls.Z_array = np.asarray(Z)
+        cls.p_array = np.asarray(p)
+        cls.integer_data = all(np.issubdtype(array.dtype, np.integer) for array in (cls.T_array, cls.Z_array, cls.p_array))
+        cls.static_legal = bool(
+            np.all((0 <= cls.Z_array) & (cls.Z_array <= 10))
+            and np.all((0 <= cls.p_array) & (cls.p_array <= 10))
+        )
+
         cls.alpha = alpha
         cls.beta = beta
         cls.gamma = gamma
         cls.delta = delta
 
         cls.loss_function = get_evaluator_fn(alpha, beta, gamma, delta)
+        cls.batch_loss_function = get_batch_evaluator_fn(alpha, beta, gamma, delta)
+        cls.assignment_loss_function = get_assignment_evaluator_fn(alpha, beta, gamma, delta)
+
+        kernels.warm_up(cls.T_array, cls.Z_array, cls.p_array, L)
+
+        # fitness of recently seen solutions by content hash (a new, empty cache for every problem)
+        cls.fitness_cache = FitnessCache(fitness_cache_size) if fitness_cache_size else None
+        cls.deduplicate = deduplicate
 
     @classmethod
     def get_data_and_config(cls):
         return (cls.T, cls.Z, cls.L, cls.num_employees, cls.num_tasks)
+
+    @classmethod
+    def get_initialize_arguments(cls):
+        # everything needed to set up Solution the same way in another process
+        return {
+            "T": cls.T_array,
+            "Z": cls.Z_array,
+            "p": cls.p_array,
+            "L": cls.L,
+            "num_employees": cls.num_employees,
+            "num_tasks": cls.num_tasks,
+            "alpha": cls.alpha,
+            "beta": cls.beta,
+            "gamma": cls.gamma,
+            "delta": cls.delta,
+            "fitness_cache_size": cls.fitness_cache.size if cls.fitness_cache is not None else 0,
+            "deduplicate": cls.deduplicate,
+        }
     
 
     def is_legal(self):
-        for emp in range(self.num_employees):
-            res_1 = 0
-
-            for task in range(self.num_tasks):
-                
-                res_1 += self.T[emp][task] * self.R[emp][task]
-
-                if not (0 <= self.Z[emp][task] <= 10):
-                    return False
-                
-                if not (0 <= self.R[emp][task] <= 1):
-                    return False
-                
-                if not (0 <= self.p[task] <= 10):
-                    return False
-
-            if not (0 <= res_1 <= self.L):
-                return False
-
-        res_5 = 0    
-
-        for task in range(self.num_tasks):
-            res_5 = 0
-            for emp in range(self.num_employees):
-                res_5 += self.R[emp][task]
-            
-            if not (0 <= res_5 <= 1):
-                return False
-            
-        return True
+        # O(1): Z and p bounds are checked once in initialize, the rest is tracked in SolutionState
+        Solution.is_legal_calls += 1
+        state = self._get_state()
+        return self.static_legal and state.overloaded == 0 and state.conflicts == 0 and state.invalid_cells == 0
+
+    def can_assign(self, task, emp):
+        # O(1): whether setting R[emp][task] = 1 keeps emp within L and task with a single assignee
+        state = self._get_state()
+        if self._assignment is not None:
+            assigned = int(self._assignment[task] == emp)
+        else:
+            assigned = self.R[emp][task]
+        load = state.load[emp] + self.T_array[emp, task] * (1 - assigned)
+        return 0 <= load <= self.L and state.assignees[task] - assigned == 0
     
 
+# Largest number of cells of R stacked at once for evaluating R-backed solutions (each temporary is that many values).
+EVALUATION_CHUNK = 2**22
+
+def batch_fitness(solutions):
+    # (len(solutions), 5) fitness. Assignment-backed solutions are evaluated from their assignment vectors
+    # (with integer data); the others from dense R stacks of at most EVALUATION_CHUNK cells at a time.
+    fs = np.empty((len(solutions), 5))
+    T, Z, p, L = Solution.T_array, Solution.Z_array, Solution.p_array, Solution.L
+    compact = np.array([sol._assignment is not None for sol in solutions]) & Solution.integer_data
+    if compact.any():
+        indices = np.flatnonzero(compact)
+        assignments = np.stack([solutions[i]._assignment for i in indices])
+        fs[indices] = Solution.assignment_loss_function(T, Z, p, assignments, L)
+
+    dense = np.flatnonzero(~compact)
+    chunk = max(1, EVALUATION_CHUNK // (Solution.num_employees * Solution.num_tasks))
+    for start in range(0, len(dense), chunk):
+        indices = dense[start:start + chunk]
+        Rs = np.array([solutions[i].to_array() for i in indices])
+        fs[indices] = Solution.batch_loss_function(T, Z, p, Rs, L)
+    return fs
+
+def evaluate_population(population):
+    # Scores only individuals without a cached fitness (in one batch) and fills their caches.
+    # With Solution.fitness_cache, solutions found there are not scored and equal ones are scored once.
+    not_evaluated = [sol for sol in population if sol._fitness is None]
+    cache = Solution.fitness_cache
+    if cache is None:
+        groups = [[sol] for sol in not_evaluated]
+    else:
+        groups = list(cache.fill(not_evaluated).values())
+    if groups:
+        fs = batch_fitness([group[0] for group in groups])
+        for group, detailed_f in zip(groups, fs):
+            fitness = tuple(detailed_f)
+            for sol in group:
+                sol._fitness = fitness
+            if cache is not None:
+                cache.put(group[0].content_hash(), fitness)
+        Solution.evaluations += len(groups)
+
+    return np.array([sol._fitness for sol in population])
+
 def find_best_solution(population):
-    return min(population, key=lambda obj: obj.f)
+    fs = evaluate_population(population)[:, 4]
+    return population[int(np.argmin(fs))]
 
-def functions_to_names(functions):
-    return [f"{inspect.getmodule(f).__name__}.{f.__name__}" for f in functions]
+def top_k(keys, k):
+    # Indices of the k smallest keys, smallest first and ties in index order, i.e. the first k of a stable
+    # argsort, in O(n + k log k): a partition finds the k-th key and only the k selected ones are sorted.
+    keys = np.asarray(keys)
+    k = max(0, min(k, len(keys)))
+    if k < len(keys):
+        threshold = np.partition(keys, k - 1)[k - 1] if k else -np.inf
+        below = np.flatnonzero(keys < threshold)
+        tied = np.flatnonzero(keys == threshold)[:k - len(below)]
+        candidates = np.concatenate([below, tied])
+    else:
+        candidates = np.arange(len(keys))
+    return candidates[np.argsort(keys[candidates], kind="stable")]
+
+class RankedPopulation(list):
+    """
+    Population returned by a selection together with `ranking`: the indices of its individuals in ascending
+    order of F (ties in population order). The next breeding reads the order from `rank_population`
+    instead of sorting again. None means the population itself is already in that order.
+    Slicing or concatenating gives plain lists, which are ranked from scratch.
+    """
+    def __init__(self, individuals, ranking=None):
+        super().__init__(individuals)
+        self.ranking = ranking
+
+def rank_population(population):
+    # indices of `population` in ascending order of F, as sorted(population, key=lambda sol: sol.f) would order them
+    if isinstance(population, RankedPopulation):
+        if population.ranking is None:
+            return np.arange(len(population))
+        if len(population.ranking) == len(population):
+            return population.ranking
+    return np.argsort(evaluate_population(population)[:, 4], kind="stable")
+
+def without_duplicates(population, keys):
+    # With Solution.deduplicate, the keys of individuals equal (by content hash) to an earlier one
+    # become inf, so selections take them only when there are not enough distinct individuals.
+    if not Solution.deduplicate:
+        return keys
+    keys = np.array(keys, dtype=float)
+    seen = set()
+    for i, sol in enumerate(population):
+        key = sol.content_hash()
+        if key in seen:
+            keys[i] = np.inf
+        seen.add(key)
+    return keys
+
+def select_best(population, k, keys=None):
+    # The k individuals with the smallest `keys` (F by default, duplicates last, see without_duplicates),
+    # best first, as a RankedPopulation when ranked by F.
+    fs = evaluate_population(population)[:, 4] if keys is None else keys
+    order = top_k(without_duplicates(population, fs), k)
+    best = [population[i] for i in order]
+    if keys is not None:
+        return best
+    fs = fs[order]
+    # duplicates taken to fill up the population come after the distinct individuals, possibly out of order
+    return RankedPopulation(best, None if np.all(fs[:-1] <= fs[1:]) else np.argsort(fs, kind="stable"))
 
 def import_function_by_fqn(fqn):
-    module, name = fqn.split(".")
+    # registered operators come from the registry (their module is imported once, on first use),
+    # any other function is imported by its fqn
+    if fqn in OPERATORS:
+        return OPERATORS[fqn].function
+    module, name = fqn.rsplit(".", 1)
     return getattr(importlib.import_module(module), name)
 
-def evolutionary_algorithm(population, logger=None, show_progress=False, **kwargs):
-    breed_function = import_function_by_fqn(kwargs["breed_function"])
-    mutate_function = import_function_by_fqn(kwargs["mutate_function"])
-    select_function = import_function_by_fqn(kwargs["select_function"])
+PHASES = ("breed", "mutate", "evaluate", "select")
 
-    best_solution = find_best_solution(population)
+@contextmanager
+def hook_phase(hooks, phase):
+    # start_phase / end_phase of every hook (see profiling.GenerationHook) around one of PHASES
+    for hook in hooks:
+        hook.start_phase(phase)
+    try:
+        yield
+    finally:
+        # also when the phase raises, so no hook is left with an open phase
+        for hook in hooks:
+            hook.end_phase(phase)
 
-    iterable = tqdm(range(kwargs["no_generations"])) if show_progress else range(kwargs["no_generations"])
-
-    for generation in iterable:
-        children = breed_function(population)
-        children = mutate_function(children)
+def evolve_generation(population, best_solution, breed_function, mutate_function, select_function, pipeline=None, hooks=()):
+    if pipeline:
+        with hook_phase(hooks, "breed"):
+            children = pipeline.breed_and_mutate(population)
+    else:
+        with hook_phase(hooks, "breed"):
+            children = breed_function(population)
+        with hook_phase(hooks, "mutate"):
+            children = mutate_function(children)
 
+    with hook_phase(hooks, "evaluate"):
         best_child = find_best_solution(children)
-        best_solution = best_solution if best_solution.f < best_child.f else best_child
+    best_solution = best_solution if best_solution.f < best_child.f else best_child
 
+    with hook_phase(hooks, "select"):
         population = select_function(population, children)
 
-        if logger:
-            logger.log_iteration(best_solution, best_solution.get_detailed_f(), time.time())
+    return population, best_solution
+
+TERMINATION_CRITERIA = ("stagnation_generations", "stagnation_epsilon", "time_limit", "max_evaluations", "target_f")
+
+class Termination():
+    """
+    Stop conditions of a run besides `no_generations` (all optional), checked after every generation:
+
+    - `stagnation_generations` - the best F has not improved by more than `stagnation_epsilon` (default 0)
+      in that many generations,
+    - `time_limit` - seconds of wall-clock time spent in the run,
+    - `max_evaluations` - fitness evaluations (`Solution.evaluations`) done in the run,
+    - `target_f` - the best F is at most this value.
+
+    `check` returns the name of the criterion that stops the run, or None. Time and evaluations
+    are counted only while the run is running (between `start` and `check`), also across resumes.
+    """
+    def __init__(self, stagnation_generations=None, stagnation_epsilon=0.0, time_limit=None, max_evaluations=None, target_f=None):
+        self.stagnation_generations = stagnation_generations
+        self.stagnation_epsilon = stagnation_epsilon
+        self.time_limit = time_limit
+        self.max_evaluations = max_evaluations
+        self.target_f = target_f
+        self.elapsed = 0.0
+        self.evaluations = 0
+        self.reference_f = None
+        self.generations_without_improvement = 0
+        self._last_time = None
+        self._last_evaluations = None
+
+    def start(self, best_f):
+        self._last_time = time.time()
+        self._last_evaluations = Solution.evaluations
+        if self.reference_f is None:
+            self.reference_f = best_f
+
+    def check(self, best_f):
+        now = time.time()
+        self.elapsed += now - self._last_time
+        self.evaluations += Solution.evaluations - self._last_evaluations
+        self._last_time, self._last_evaluations = now, Solution.evaluations
+
+        if best_f < self.reference_f - self.stagnation_epsilon:
+            self.reference_f = best_f
+            self.generations_without_improvement = 0
+        else:
+            self.generations_without_improvement += 1
+
+        if self.target_f is not None and best_f <= self.target_f:
+            return "target_f"
+        if self.stagnation_generations and self.generations_without_improvement >= self.stagnation_generations:
+            return "stagnation"
+        if self.time_limit is not None and self.elapsed >= self.time_limit:
+            return "time_limit"
+        if self.max_evaluations is not None and self.evaluations >= self.max_evaluations:
+            return "max_evaluations"
+        return None
+
+class EvolutionRun():
+    """
+    One run of the evolutionary algorithm that can be advanced in increments of generations:
+    `run(10)` followed by `run(40)` gives the same result as 50 generations at once.
+
+    Between increments the run can be pickled (population, best solution, generation counter and
+    the states of `random` and NumPy's global generator; not the logger), e.g. to continue it in
+    another process. `close` must be called when the run is done (it stops the worker pool).
+    With `checkpoint_interval`, `logger.save_checkpoint(run)` is called every that many generations.
+    A run stopped by its `termination` (see `Termination`) keeps the reason in `stop_reason` and does not continue.
+    `hooks` (see `profiling.GenerationHook`) are called around every generation and its phases;
+    the columns they return are logged with the generation. They are not pickled.
+    """
+    def __init__(
+        self, population, breed_function, mutate_function, select_function, logger=None, workers=1, termination=None, hooks=(),
+    ):
+        self.population = population
+        self.best_solution = find_best_solution(population)
+        self.generation = 0
+        self.function_names = {
+            "breed_function": breed_function,
+            "mutate_function": mutate_function,
+            "select_function": select_function,
+        }
+        self.workers = workers
+        self.logger = logger
+        self.termination = termination
+        self.hooks = list(hooks)
+        self.stop_reason = None
+        self.random_state = None
+        self._functions = None
+        self._pipeline = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.update(logger=None, hooks=[], _functions=None, _pipeline=None)
+        return state
+
+    def save_random_state(self):
+        self.random_state = (random.getstate(), np.random.get_state())
+
+    def run(self, no_generations, show_progress=False, checkpoint_interval=None):
+        if self.stop_reason is not None:
+            return self.best_solution
+        if self._functions is None:
+            self._functions = [import_function_by_fqn(fqn) for fqn in self.function_names.values()]
+        # with workers > 1 breeding, mutation and evaluation of children run in a process pool
+        if self.workers > 1 and self._pipeline is None:
+            from parallel import ParallelPipeline  # parallel imports this module
+            self._pipeline = ParallelPipeline(
+                self.workers, self.function_names["breed_function"], self.function_names["mutate_function"]
+            )
+        if self.random_state is not None:
+            random.setstate(self.random_state[0])
+            np.random.set_state(self.random_state[1])
+
+        iterable = tqdm(range(no_generations)) if show_progress else range(no_generations)
+        if self.termination:
+            self.termination.start(self.best_solution.f)
+
+        for generation in iterable:
+            for hook in self.hooks:
+                hook.start_generation(self.generation)
+            self.population, self.best_solution = evolve_generation(
+                self.population, self.best_solution, *self._functions, self._pipeline, self.hooks
+            )
+            columns = {}
+            for hook in self.hooks:
+                columns.update(hook.end_generation(self.generation))
+            self.generation += 1
+
+            if self.termination:
+                self.stop_reason = self.termination.check(self.best_solution.f)
+
+            if self.logger:
+                self.logger.log_iteration(self.best_solution, self.best_solution.get_detailed_f(), time.time(), columns)
+                if checkpoint_interval and self.generation % checkpoint_interval == 0:
+                    self.save_random_state()
+                    self.logger.save_checkpoint(self)
+
+            if self.stop_reason is not None:
+                break
+
+        self.save_random_state()
+        return self.best_solution
+
+    def close(self):
+        if self._pipeline:
+            self._pipeline.close()
+            self._pipeline = None
+
+    def close_hooks(self):
+        # summaries of the hooks that have one, by hook name
+        summaries = {}
+        for hook in self.hooks:
+            summary = hook.close()
+            if summary is not None:
+                summaries[hook.name] = summary
+        return summaries
+
+def evolutionary_algorithm(population, logger=None, show_progress=False, resume=None, **kwargs):
+    # resume: an EvolutionRun restored from a checkpoint (see Logger.load_checkpoint),
+    # continued up to `no_generations` generations in total instead of starting from `population`
+    if kwargs.get("islands"):
+        if resume is not None or kwargs.get("checkpoint_interval"):
+            raise ValueError("Checkpoints are not supported in the island model")
+        if kwargs.get("termination"):
+            raise ValueError("Termination criteria are not supported in the island model")
+        if kwargs.get("hooks"):
+            raise ValueError("Hooks are not supported in the island model")
+        from islands import island_model  # islands imports this module
+        return island_model(population, logger=logger, show_progress=show_progress, **kwargs)
+
+    if resume is None:
+        run = EvolutionRun(
+            population,
+            kwargs["breed_function"],
+            kwargs["mutate_function"],
+            kwargs["select_function"],
+            logger=logger,
+            workers=kwargs.get("workers", 1),
+            termination=Termination(**kwargs["termination"]) if kwargs.get("termination") else None,
+            hooks=kwargs.get("hooks") or (),
+        )
+    else:
+        run = resume
+        run.logger = logger
+        run.hooks = list(kwargs.get("hooks") or ())
+        run.workers = kwargs.get("workers", run.workers)
+        if run.termination is None and kwargs.get("termination"):
+            run.termination = Termination(**kwargs["termination"])
+    try:
+        best_solution = run.run(
+            max(0, kwargs["no_generations"] - run.generation), show_progress, kwargs.get("checkpoint_interval")
+        )
+    finally:
+        run.close()
+        summaries = run.close_hooks()
 
-    return best_solution
\ No newline at end of file
+    if logger:
+        logger.log_termination(run.stop_reason or "no_generations", run.generation, run.termination)
+        if summaries:
+            logger.log_profile_summary(summaries)
+    return best_solution
@@ -1,90 +1,292 @@
-import copy
+import json
+import math
 import multiprocessing
+import os
+import random
+import sys
+import time
+from pathlib import Path
 
+import numpy as np
 from tqdm import tqdm
-from example_function_file import defined_functions as example_functions
-from dominance_hierarchy_functions import defined_functions as dominance_hierarchy_functions
-from evolutionary_functions import defined_functions as evolutionary_functions
-from lukasz_function import defined_functions as lukasz_functions
-from maciek_function_file import defined_functions_maciek as maciek_functions
-from genetic_algorithm import Solution, evolutionary_algorithm, functions_to_names
+from genetic_algorithm import EvolutionRun, Solution, evolutionary_algorithm, fingerprint
 from itertools import product
-from taskplanner import generate_tasks, generate_input_matrices, Employee, Task
-from evaluate import solve
+from operators import OPERATORS, list_operators
+from parallel import compacted, initialize_from_context, release_shared_memory, share_problem_data
+from seeding import seed_population
+from taskplanner import Employee, generate_instance, solve
 from uuid import uuid1
 
 
 grid_params = {
     "no_generations": [50, 100],
-    "breed_function": functions_to_names([
-        *example_functions["breed"],
-        *evolutionary_functions["breed"],
-        *dominance_hierarchy_functions["breed"],
-        *lukasz_functions["breed"],
-        *maciek_functions["breed"],
-    ]),
-    "mutate_function": functions_to_names([
-        *example_functions["mutate"],
-        *evolutionary_functions["mutate"],
-        *dominance_hierarchy_functions["mutate"],
-        *lukasz_functions["mutate"],
-        *maciek_functions["mutate"],
-    ]),
-    "select_function": functions_to_names([
-        *example_functions["select"],
-        *evolutionary_functions["select"],
-        *dominance_hierarchy_functions["select"],
-        *lukasz_functions["select"],
-        *maciek_functions["select"],
-    ]),
+    "breed_function": [operator.fqn for operator in list_operators("breed")],
+    "mutate_function": [operator.fqn for operator in list_operators("mutate")],
+    "select_function": [operator.fqn for operator in list_operators("select")],
 }
 
-def run_grid_search(params):
-    (process_name, T, Z, p, L, param_names, param_combinations) = params
 
-    with open(f"{process_name}_{uuid1()}.txt", "w") as fin:
-        num_tasks = len(T[0])
-        num_employees = len(T)
+def expected_cost(params):
+    # from the `cost` of the registered operators (1 for functions outside the registry), only used
+    # to start the slowest combinations first so that no worker is left with a straggler at the end
+    per_generation = sum(
+        OPERATORS[params[key]].cost if params[key] in OPERATORS else 1
+        for key in ("breed_function", "mutate_function", "select_function")
+    )
+    return params["no_generations"] * per_generation
 
-        Solution.initialize(T, Z, p, L, num_employees, num_tasks)
 
-        best_solution = None
-        best_params = None
+class ResultCache():
+    """
+    On-disk cache of grid search results, one JSON lines file per instance (fingerprint of T, Z, p and L)
+    in `cache_dir`. An entry is keyed by the starting population, the parameter combination and the seed.
+    Every result is appended and flushed as soon as it arrives, so an interrupted sweep resumes where it
+    stopped and a grid extended with new functions only runs the new combinations.
+    Delete the cache directory to force re-running everything (e.g. after changing an operator).
+    """
+    def __init__(self, T, Z, p, L, cache_dir=".grid_search_cache"):
+        Path(cache_dir).mkdir(parents=True, exist_ok=True)
+        self.path = Path(cache_dir) / f"{fingerprint(T, Z, p, np.array(L))}.jsonl"
+        self.results = {}
 
-        results  = {}
+        if self.path.exists():
+            with open(self.path, "rb+") as f:
+                content = f.read()
+                # a run killed while writing leaves a partial last line, new entries must not be glued to it
+                complete = content.rfind(b"\n") + 1
+                if complete < len(content):
+                    f.truncate(complete)
+            for line in content[:complete].decode().splitlines():
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                self.results[entry["key"]] = entry["result"]
 
-        starting_population = [Solution(solve(*Solution.get_data_and_config())) for _ in range(200)]
+        self._file = open(self.path, "a")
 
-        def format_f(detailed_f):
-            return [float(x) for x in detailed_f]
+    @staticmethod
+    def key(population_fingerprint, params, seed):
+        return json.dumps([population_fingerprint, params, seed], sort_keys=True)
 
-        for combination in tqdm(param_combinations, desc=process_name):
-            params = dict(zip(param_names, combination))
-            solution = evolutionary_algorithm(starting_population, **params)
+    def get(self, key):
+        return self.results.get(key)
 
-            fin.write(f"{format_f(solution.get_detailed_f())} ; {params}\n")
+    def put(self, key, result):
+        self.results[key] = result
+        self._file.write(json.dumps({"key": key, "result": result}) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
 
-            if best_solution is None or best_solution.f > solution.f:
-                best_solution = copy.deepcopy(solution)
-                best_params = copy.deepcopy(params)
-                print()
-                print(float(best_solution.f))
-                print(best_params)
-                print()
-                print()
+    def close(self):
+        self._file.close()
 
-            results[params.values()] = format_f(solution.get_detailed_f())
 
-        fin.write(f"[[ BEST ]] {format_f(best_solution.get_detailed_f())} ; {best_params}\n")
+def format_f(detailed_f):
+    return [float(x) for x in detailed_f]
 
-def equal_split(data, n_chunks):
-    chunk_size = len(data) // n_chunks
 
-    start = 0
-    for _ in range(n_chunks-1):
-        yield data[start:start+chunk_size]
-        start += chunk_size
-    yield data[start:]
+_starting_population = None
+
+
+def _init_worker(context, starting_population):
+    global _starting_population
+    initialize_from_context(context)
+    _starting_population = starting_population
+
+
+def run_combination(task):
+    (params, seed) = task
+    random.seed(seed)
+    np.random.seed(seed)
+
+    # every combination starts from fresh copies: operators change ages and R of their population
+    population = [sol.copy() for sol in _starting_population]
+    start = time.time()
+    solution = evolutionary_algorithm(population, **params)
+
+    return params, seed, format_f(solution.get_detailed_f()), time.time() - start
+
+
+def starting_population_for(population_size, seeding=None):
+    if seeding:
+        return seed_population(population_size, seeding)
+    return compacted([Solution(solve(*Solution.get_data_and_config())) for _ in range(population_size)])
+
+
+def run_grid_search(
+    T, Z, p, L, grid_params, seeds=(0,), processes=None, population_size=200, population_seed=0,
+    output=None, cache_dir=".grid_search_cache", seeding=None,
+):
+    """
+    Runs `evolutionary_algorithm` for every combination of `grid_params` and seed on one instance.
+
+    Combinations are handed out to the worker pool one at a time, the most expensive ones
+    (see `expected_cost`) first; all workers share T, Z, p and one starting population
+    (generated with `population_seed`, by `seeding.seed_population` with the proportions `seeding` if given).
+    Results already in the `ResultCache` in `cache_dir`
+    are not computed again (`cache_dir=None` disables the cache).
+    Every result is appended by the main process to the JSON lines file `output`
+    (`{"params", "seed", "f", "time", "cached"}`), the best one is returned.
+    """
+    Solution.initialize(T, Z, p, L, len(T), len(T[0]))
+    random.seed(population_seed)
+    starting_population = starting_population_for(population_size, seeding)
+    population_fingerprint = fingerprint(*(sol.assignment for sol in starting_population))
+
+    param_names = list(grid_params.keys())
+    tasks = [
+        (dict(zip(param_names, combination)), seed)
+        for combination in product(*grid_params.values())
+        for seed in seeds
+    ]
+    tasks.sort(key=lambda task: expected_cost(task[0]), reverse=True)
+
+    if output is None:
+        output = f"grid_search_{uuid1()}.jsonl"
+    processes = processes or os.cpu_count()
+    cache = ResultCache(T, Z, p, L, cache_dir) if cache_dir is not None else None
+
+    best = None
+
+    def record(result, results):
+        nonlocal best
+        results.write(json.dumps(result) + "\n")
+        results.flush()
+        if best is None or best["f"][4] > result["f"][4]:
+            best = result
+            tqdm.write(f"{result['f'][4]} {result['params']}")
+
+    shared_memory_blocks, context = share_problem_data()
+    try:
+        with open(output, "a") as results:
+            missing_tasks = []
+            for params, seed in tasks:
+                cached = cache.get(ResultCache.key(population_fingerprint, params, seed)) if cache else None
+                if cached is None:
+                    missing_tasks.append((params, seed))
+                else:
+                    record({**cached, "cached": True}, results)
+            if cache:
+                print(f"{len(tasks) - len(missing_tasks)} of {len(tasks)} results found in cache {cache.path}")
+
+            with multiprocessing.Pool(processes, initializer=_init_worker, initargs=(context, starting_population)) as pool:
+                for params, seed, detailed_f, elapsed in tqdm(
+                    pool.imap_unordered(run_combination, missing_tasks), total=len(missing_tasks)
+                ):
+                    result = {"params": params, "seed": seed, "f": detailed_f, "time": elapsed}
+                    if cache:
+                        cache.put(ResultCache.key(population_fingerprint, params, seed), result)
+                    record({**result, "cached": False}, results)
+    finally:
+        release_shared_memory(shared_memory_blocks)
+        if cache:
+            cache.close()
+
+    print(f"[[ BEST ]] {best['f']} ; {best['params']}")
+    print(f"Results saved to {output}")
+    return best
+
+
+def run_rung(task):
+    (index, params, seed, run, no_generations) = task
+    start = time.time()
+    if run is None:
+        random.seed(seed)
+        np.random.seed(seed)
+        run = EvolutionRun([sol.copy() for sol in _starting_population], **params)
+
+    run.run(no_generations - run.generation)
+    run.close()
+    compacted(run.population)
+    compacted([run.best_solution])
+
+    return index, seed, run, format_f(run.best_solution.get_detailed_f()), time.time() - start
+
+
+def run_racing(
+    T, Z, p, L, grid_params, seeds=(0,), min_generations=10, eta=3, processes=None, population_size=200,
+    population_seed=0, output=None, seeding=None,
+):
+    """
+    Racing (successive halving) version of `run_grid_search` for the function combinations of `grid_params`.
+
+    Every combination first runs `min_generations` generations for every seed. Only the best `1 / eta`
+    of the combinations (by mean F over the seeds) survive a rung; their runs are resumed where they
+    stopped with `eta` times more generations, until the largest value of `grid_params["no_generations"]`
+    is reached. Paused runs (`EvolutionRun`) travel between the main process and the workers.
+    Every rung result is appended to the JSON lines file `output`
+    (`{"rung", "params", "seed", "f", "time"}`, `params["no_generations"]` is the budget reached);
+    the best result of the last rung is returned. The `ResultCache` is not used.
+    """
+    Solution.initialize(T, Z, p, L, len(T), len(T[0]))
+    random.seed(population_seed)
+    starting_population = starting_population_for(population_size, seeding)
+
+    max_generations = max(grid_params.get("no_generations", [100]))
+    function_params = {key: values for key, values in grid_params.items() if key != "no_generations"}
+    combinations = [dict(zip(function_params.keys(), combination)) for combination in product(*function_params.values())]
+
+    if output is None:
+        output = f"racing_{uuid1()}.jsonl"
+    processes = processes or os.cpu_count()
+
+    runs = {(index, seed): None for index in range(len(combinations)) for seed in seeds}
+    alive = list(range(len(combinations)))
+    budget = min(min_generations, max_generations)
+    rung = 0
+    best = None
+
+    shared_memory_blocks, context = share_problem_data()
+    try:
+        with open(output, "a") as results, \
+                multiprocessing.Pool(processes, initializer=_init_worker, initargs=(context, starting_population)) as pool:
+            while True:
+                tasks = [(index, combinations[index], seed, runs[(index, seed)], budget) for index in alive for seed in seeds]
+                tasks.sort(
+                    key=lambda task: expected_cost({**task[1], "no_generations": budget - (task[3].generation if task[3] else 0)}),
+                    reverse=True,
+                )
+
+                f_sums = {index: 0.0 for index in alive}
+                rung_best = None
+                for index, seed, run, detailed_f, elapsed in tqdm(
+                    pool.imap_unordered(run_rung, tasks), total=len(tasks), desc=f"rung {rung} ({budget} generations)"
+                ):
+                    runs[(index, seed)] = run
+                    f_sums[index] += detailed_f[4]
+                    result = {
+                        "rung": rung,
+                        "params": {"no_generations": budget, **combinations[index]},
+                        "seed": seed,
+                        "f": detailed_f,
+                        "time": elapsed,
+                    }
+                    results.write(json.dumps(result) + "\n")
+                    results.flush()
+                    if rung_best is None or rung_best["f"][4] > detailed_f[4]:
+                        rung_best = result
+
+                best = rung_best
+                tqdm.write(f"rung {rung}: {len(alive)} combinations, best {best['f'][4]} {best['params']}")
+                if budget == max_generations:
+                    break
+
+                alive.sort(key=lambda index: f_sums[index])
+                survivors = alive[:max(1, math.ceil(len(alive) / eta))]
+                for index in set(alive) - set(survivors):
+                    for seed in seeds:
+                        del runs[(index, seed)]
+                alive = survivors
+                budget = min(budget * eta, max_generations)
+                rung += 1
+    finally:
+        release_shared_memory(shared_memory_blocks)
+
+    print(f"[[ BEST ]] {best['f']} ; {best['params']}")
+    print(f"Results saved to {output}")
+    return best
+
 
 if __name__ == "__main__":
     employees = [
@@ -94,16 +296,13 @@ if __name__ == "__main__":
         Employee([], 10, [0, 99], [x for x in range(10)]),
     ]
 
-    tasks = generate_tasks(50)
-
-    T, Z, p = generate_input_matrices(employees, tasks)
+    # a fixed instance, so that re-running the sweep (or resuming an interrupted one) hits the ResultCache;
+    # python grid_search.py [--racing] [--instance-seed N]
+    instance_seed = int(sys.argv[sys.argv.index("--instance-seed") + 1]) if "--instance-seed" in sys.argv else 0
+    T, Z, p = generate_instance(50, employees=employees, seed=instance_seed)
     L = 40
 
-    num_parallel = 8
-
-    combinations_chunks = equal_split(list(product(*grid_params.values())), num_parallel)
-    pool = multiprocessing.Pool(num_parallel)
-
-    param_names = list(grid_params.keys())
-
-    pool.map(run_grid_search, ((f"process_{i+1}", T, Z, p, L, param_names, chunk) for (i, chunk) in enumerate(combinations_chunks)))
+    if "--racing" in sys.argv:
+        run_racing(T, Z, p, L, grid_params)
+    else:
+        run_grid_search(T, Z, p, L, grid_params)
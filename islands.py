@@ -0,0 +1,147 @@
+import multiprocessing
+import random
+import time
+
+import numpy as np
+from tqdm import tqdm
+
+from genetic_algorithm import evolve_generation, find_best_solution, import_function_by_fqn, select_best
+from parallel import compacted, initialize_from_context, release_shared_memory, share_problem_data
+
+TOPOLOGIES = ("ring", "fully_connected")
+ISLAND_DEFAULTS = {"migration_interval": 10, "migration_size": 1, "topology": "ring"}
+
+
+def migration_targets(topology, island, no_islands):
+    if topology == "ring":
+        return [(island + 1) % no_islands]
+    # fully_connected
+    return [target for target in range(no_islands) if target != island]
+
+
+def _receive_migrants(population, migrants):
+    # migrants replace the worst individuals, the island keeps its size
+    migrants = migrants[:len(population) // 2]
+    if not migrants:
+        return population
+    survivors = select_best(population, len(population) - len(migrants))
+    return survivors + migrants
+
+
+def _island_process(connection, context, functions, population, migration_size, seed):
+    # Runs one island: waits for (no_generations, migrants), evolves and answers with
+    # (best solution after every generation with its time, best individuals to migrate).
+    # None stops the island.
+    initialize_from_context(context)
+    random.seed(seed)
+    np.random.seed(seed % 2**32)
+    functions = [import_function_by_fqn(functions[key]) for key in ("breed_function", "mutate_function", "select_function")]
+
+    best_solution = find_best_solution(population)
+    while (message := connection.recv()) is not None:
+        no_generations, migrants = message
+        population = _receive_migrants(population, migrants)
+        best_solution = find_best_solution([best_solution, *migrants])
+
+        history = []
+        for _ in range(no_generations):
+            population, best_solution = evolve_generation(population, best_solution, *functions)
+            history.append((best_solution, time.time()))
+
+        emigrants = [sol.copy() for sol in select_best(population, migration_size)]
+        compacted([best for best, _ in history])
+        connection.send((history, compacted(emigrants)))
+    connection.close()
+
+
+def split_population(population, no_islands):
+    population = list(population)
+    if len(population) < 2 * no_islands:
+        raise ValueError(f"Population of {len(population)} is too small for {no_islands} islands (2 individuals per island needed)")
+    random.shuffle(population)
+    return [population[i::no_islands] for i in range(no_islands)]
+
+
+def island_model(population, logger=None, show_progress=False, **kwargs):
+    """
+    Island mode of `evolutionary_algorithm`, used when `kwargs["islands"]` is given:
+
+    - `count` - number of islands; the starting population is split between them and every island evolves in its own process,
+    - `migration_interval` - every that many generations the best `migration_size` individuals of every island
+      are copied to its neighbours (given by `topology`: `"ring"` or `"fully_connected"`), where they replace the worst ones,
+    - `functions` (optional) - list of dicts with `breed_function`, `mutate_function` and `select_function`;
+      island `i` uses entry `i % len(functions)`, missing entries default to the functions of the run.
+
+    The logger gets the best solution over all islands for every generation, the best F of every island per migration
+    and the termination record at the end.
+    """
+    islands = {**ISLAND_DEFAULTS, **kwargs["islands"]}
+    no_islands = islands["count"]
+    default_functions = {key: kwargs[key] for key in ("breed_function", "mutate_function", "select_function")}
+    island_functions = [
+        {**default_functions, **islands["functions"][i % len(islands["functions"])]} if islands.get("functions") else default_functions
+        for i in range(no_islands)
+    ]
+
+    best_solution = find_best_solution(population)
+    populations = split_population(compacted(list(population)), no_islands)
+
+    shared_memory_blocks, context = share_problem_data()
+    connections = []
+    processes = []
+    try:
+        for i in range(no_islands):
+            connection, island_connection = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=_island_process,
+                args=(island_connection, context, island_functions[i], populations[i], islands["migration_size"], random.getrandbits(64)),
+                daemon=True,
+            )
+            process.start()
+            island_connection.close()
+            connections.append(connection)
+            processes.append(process)
+
+        progress = tqdm(total=kwargs["no_generations"]) if show_progress else None
+        migrants = [[] for _ in range(no_islands)]
+        generation = 0
+        while generation < kwargs["no_generations"]:
+            no_generations = min(islands["migration_interval"], kwargs["no_generations"] - generation)
+            for connection, island_migrants in zip(connections, migrants):
+                connection.send((no_generations, island_migrants))
+            results = [connection.recv() for connection in connections]
+
+            for g in range(no_generations):
+                bests = [history[g] for history, _ in results]
+                island_best = min(bests, key=lambda best: best[0].f)[0]
+                best_solution = best_solution if best_solution.f < island_best.f else island_best
+                if logger:
+                    logger.log_iteration(best_solution, best_solution.get_detailed_f(), max(t for _, t in bests))
+            generation += no_generations
+
+            migrants = [[] for _ in range(no_islands)]
+            for i, (_, emigrants) in enumerate(results):
+                for target in migration_targets(islands["topology"], i, no_islands):
+                    migrants[target].extend(sol.copy() for sol in emigrants)
+
+            if logger:
+                logger.log_islands(generation, [history[-1][0].get_detailed_f() for history, _ in results])
+            if progress:
+                progress.update(no_generations)
+
+        for connection in connections:
+            connection.send(None)
+        for process in processes:
+            process.join()
+        if progress:
+            progress.close()
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        release_shared_memory(shared_memory_blocks)
+
+    if logger:
+        # termination criteria are not supported here, the islands always run all generations
+        logger.log_termination("no_generations", generation)
+    return best_solution
@@ -0,0 +1,103 @@
+"""
+Compiled kernels of the batch fitness evaluation and of the repair step (see `repair.py`).
+
+With numba installed they are compiled with `numba.njit` and used automatically; without it
+(or with `set_backend("numpy")`) the NumPy implementations in `genetic_algorithm` and `repair` run.
+Both backends give bit-identical results: the kernels only replace integer arithmetic (sums of
+T, Z and p over assigned tasks), so they are used only when T, Z and p are integer arrays;
+floating-point reductions stay in NumPy in both cases.
+"""
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+BACKENDS = ("auto", "numba", "numpy")
+
+backend = "auto"
+
+
+def set_backend(name):
+    global backend
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown kernel backend {name}. Try one of: {', '.join(BACKENDS)}")
+    if name == "numba" and numba is None:
+        raise ValueError("Kernel backend numba requires the numba package (pip install numba)")
+    backend = name
+
+
+def compiled(*arrays):
+    # whether the numba kernels are used for these arrays
+    if numba is None or backend == "numpy":
+        return False
+    return all(np.issubdtype(array.dtype, np.integer) for array in arrays)
+
+
+def _jit(function):
+    return numba.njit(cache=True)(function) if numba is not None else function
+
+
+@_jit
+def employee_sums(T, Z, p, Rs):
+    # per individual and employee: working time, priority-weighted time and satisfaction of the assigned tasks
+    n, m, k = Rs.shape
+    load = np.zeros((n, m), dtype=np.int64)
+    weighted = np.zeros((n, m), dtype=np.int64)
+    satisfaction = np.zeros((n, m), dtype=np.int64)
+    for i in range(n):
+        for j in range(m):
+            for task in range(k):
+                r = Rs[i, j, task]
+                if r != 0:
+                    load[i, j] += T[j, task] * r
+                    weighted[i, j] += T[j, task] * (11 - p[task]) * r
+                    satisfaction[i, j] += Z[j, task] * r
+    return load, weighted, satisfaction
+
+
+@_jit
+def drop_over_budget(Rs, T, order, L):
+    # repair.drop_over_budget for one drop order (task order of every employee), in place
+    n, m, k = Rs.shape
+    for i in range(n):
+        for j in range(m):
+            load = 0
+            for task in range(k):
+                load += T[j, task] * Rs[i, j, task]
+            before = 0
+            for index in range(k):
+                task = order[j, index]
+                time = T[j, task] * Rs[i, j, task]
+                if Rs[i, j, task] == 1 and load - before > L:
+                    Rs[i, j, task] = 0
+                before += time
+    return Rs
+
+
+@_jit
+def refill(load, unassigned, T, tasks, L):
+    # repair.refill: `tasks` in priority order, each unassigned one goes to the first employee with time for it
+    n, m = load.shape
+    filled = np.full(unassigned.shape, -1, dtype=np.int64)
+    for i in range(n):
+        for task in tasks:
+            if not unassigned[i, task]:
+                continue
+            for j in range(m):
+                if load[i, j] + T[j, task] <= L:
+                    filled[i, task] = j
+                    load[i, j] += T[j, task]
+                    break
+    return filled
+
+
+def warm_up(T, Z, p, L):
+    # compiles the kernels for the dtypes of this problem once, instead of in the first generation
+    if not compiled(T, Z, p):
+        return
+    Rs = np.zeros((1, *T.shape), dtype=np.int64)
+    employee_sums(T, Z, p, Rs)
+    drop_over_budget(Rs, T, np.argsort(T, axis=1, kind="stable"), L)
+    refill(np.zeros((1, T.shape[0]), dtype=np.int64), np.zeros((1, T.shape[1]), dtype=np.bool_), T, np.argsort(-p, kind="stable"), L)
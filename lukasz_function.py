@@ -1,6 +1,6 @@
 import random
-from copy import copy, deepcopy
-from genetic_algorithm import Solution
+from genetic_algorithm import select_best
+from repair import repair_population
 
 
 def remove_task(parent, task):
@@ -10,27 +10,16 @@ def remove_task(parent, task):
                 return
 
 def legal_child(child):
-    if not child.is_legal():
-        for employee in range(len(child.R)):
-            time_count = 0
-            task_dict = dict()
-            for task in range(len(child.R[0])):
-                if child.R[employee][task] != 0:
-                    task_dict[task] = child.T[employee][task]
-                    time_count += task_dict[task]
-
-            if time_count > child.L:
-                keys = sorted(task_dict, key=lambda k: task_dict[k], reverse=False)
-                for key in keys:
-                    time_count -= task_dict[key]
-                    child.R[employee][key] = 0
-                    if time_count <= child.L:
-                        break
+    legal_children([child])
+
+def legal_children(children):
+    # drops tasks of over-budget employees (shortest first by default), nothing else
+    return repair_population(children, duplicates=False, fill=False)
 
 def breed(population):
 
     def create_child(parent1, parent2):
-        child = Solution(deepcopy(parent1.R))
+        child = parent1.copy()
 
         swap_task_number = random.randint(1,len(parent1.R[0]))
         employees_number = len(child.R)
@@ -50,7 +39,6 @@ def breed(population):
 
             child.R[new_employee][task_number_2] = 1
 
-        legal_child(child)
         return child
 
     children = []
@@ -62,7 +50,7 @@ def breed(population):
         children.append(create_child(parent1, parent2))
         children.append(create_child(parent2, parent1))
             
-    return children
+    return legal_children(children)
 
 def mutation(children):
     children_number = len(children)
@@ -80,22 +68,9 @@ def mutation(children):
         remove_task(children[child_number], task)
         children[child_number].R[employee][task] = 1
 
-    for child_number in range(children_number):
-        legal_child(children[child_number])
-
-    return children
+    return legal_children(children)
 
 def select(population, children):
-    n = len(population)
-    all = population + children
-
-    all.sort( key = lambda obj: obj.f)
-
-    return all[:n]
+    return select_best(population + children, len(population))
 
          
-defined_functions = {
-    "breed": [breed],
-    "mutate": [mutation],
-    "select": [select],
-}
\ No newline at end of file
@@ -1,6 +1,6 @@
 import random
-from copy import deepcopy
-from genetic_algorithm import Solution
+from genetic_algorithm import Solution, select_best
+from repair import repair_population
 
 
 def shuffle_breed(population):
@@ -31,95 +31,41 @@ def shuffle_breed(population):
 
         return Solution(child_R)
 
-    def fix_until_legal(child):
-        num_employees = len(child.R)
-        num_tasks = len(child.R[0])
-
-        for task in range(num_tasks):
-            if child.is_legal():
-                break
-
-            for emp in range(num_employees):
-                child.R[emp][task] = 0
-
-        return child
-
     children = []
 
     for _ in range(len(population)//2):
         parent1 = random.choice(population)
         parent2 = random.choice(population)
 
-        child1 = create_child(parent1, parent2)
-        child2 = create_child(parent2, parent1)
-        child1 = fix_until_legal(child1)
-        child2 = fix_until_legal(child2)
-        children.append(child1)
-        children.append(child2)
+        children.append(create_child(parent1, parent2))
+        children.append(create_child(parent2, parent1))
 
-    return children
+    # drop tasks of over-budget employees, without refilling
+    return repair_population(children, fill=False)
 
 def repair_mutation(children, max_attempts=1):
-
-    for child in children:
-        # if not child.is_legal():
-        #     raise Exception("mutation received illegal child")
-
-
-        num_employees = len(child.R)
-        num_tasks = len(child.R[0])
-
-        for task in range(num_tasks):
-            assigned = any(child.R[emp][task] == 1 for emp in range(num_employees))
-
-            if not assigned:
-                old_state = deepcopy(child.R)
-                success = False
-
-                for _ in range(max_attempts):
-                    candidate_emp = random.randint(0, num_employees - 1)
-
-                    for emp in range(num_employees):
-                        child.R[emp][task] = 0
-
-                    child.R[candidate_emp][task] = 1
-
-                    if child.is_legal():
-                        success = True
-                        break
-
-                if not success:
-                    child.R = old_state
-        #
-        # if not child.is_legal():
-        #     raise Exception("mutation made illegal child")
-
-    return children
+    # fills unassigned tasks, each with one of `max_attempts` random employees that has time for it
+    # (and fixes anything illegal on the way)
+    return repair_population(children, fill="random", max_attempts=max_attempts)
 
 def shuffle_mutation(children):
     for child in children:
-        num_employees = len(child.R)
-        num_tasks = len(child.R[0])
+        num_employees = Solution.num_employees
+        num_tasks = Solution.num_tasks
 
         task = random.randint(0, num_tasks - 1)
 
-        current_emp = None
-        for emp in range(num_employees):
-            if child.R[emp][task] == 1:
-                current_emp = emp
-                break
-
-        if current_emp is not None:
-            new_emp = (current_emp + 1) % num_employees
+        current_employees = child.assigned_employees(task)
 
-            old_state = deepcopy(child.R)
+        if current_employees:
+            new_emp = (current_employees[0] + 1) % num_employees
 
-            for emp in range(num_employees):
-                child.R[emp][task] = 0
-            child.R[new_emp][task] = 1
+            child.reassign(task, new_emp)
 
             if not child.is_legal():
-                child.R = old_state
+                child.unassign(task)
+                for emp in current_employees:
+                    child.assign(task, emp)
 
     return children
 
@@ -131,14 +77,4 @@ def select_children_by_age(population, children, max_age=5):
 
     combined = [ind for ind in population + children if ind.age <= max_age]
 
-    population_size = len(population)
-    sorted_combined = sorted(combined, key=lambda ind: ind.f)
-
-    return sorted_combined[:population_size]
-
-
-defined_functions_maciek = {
-    "breed": [shuffle_breed],
-    "mutate": [repair_mutation, shuffle_mutation],
-    "select": [select_children_by_age],
-}
\ No newline at end of file
+    return select_best(combined, len(population))
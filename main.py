@@ -7,6 +7,11 @@ from genetic_algorithm import evolutionary_algorithm
 from file_manager import FileManager, Logger
 
 if __name__ == "__main__":
+    # --resume continues the run in the log directory experiment_results_catalog from its last checkpoint
+    resume = "--resume" in sys.argv
+    if resume:
+        sys.argv.remove("--resume")
+
     if len(sys.argv) < 2:
         print("Folder name not specified; using default='experiments'")
         folder_name = 'experiments'
@@ -20,12 +25,16 @@ if __name__ == "__main__":
 
     random.seed(0)
 
-    file_manager = Logger(folder_name, experiment_results_catalog)
+    file_manager = Logger(folder_name, experiment_results_catalog, resume=resume)
     file_manager.load_config()
 
     file_manager.init_time_of_start(time.time())
-    best_solution = evolutionary_algorithm(
-        logger=file_manager, 
-        show_progress=True,
-        **file_manager.get_evolutionary_algorithm_arguments(),
-    )
+    try:
+        best_solution = evolutionary_algorithm(
+            logger=file_manager, 
+            show_progress=True,
+            resume=file_manager.load_checkpoint() if resume else None,
+            **file_manager.get_evolutionary_algorithm_arguments(),
+        )
+    finally:
+        file_manager.close()
@@ -0,0 +1,96 @@
+import importlib
+
+KINDS = ("breed", "mutate", "select")
+
+
+class Operator():
+    """
+    Entry of the operator registry. The module of the operator is imported only when `function` is first used.
+
+    - `kind` - one of `KINDS`,
+    - `batch` - works on compact individuals (assignment vectors, see `Solution.compact`) as a whole,
+      without materializing R cell by cell,
+    - `needs_repair` - makes its output legal with the shared repair step (`repair.repair_population`),
+      so its results depend on `repair_drop_policy`,
+    - `cost` - rough relative cost of one call (1 = cheapest), used to schedule the slowest runs first,
+    - `elite` - for a breeding, the number of best individuals of the population it mates with the rest
+      (the alpha and beta of the dominance hierarchy); the parallel pipeline gives them to every shard.
+    """
+    def __init__(self, name, kind, module, batch=False, needs_repair=False, cost=1, elite=0):
+        if kind not in KINDS:
+            raise ValueError(f"Unknown operator kind {kind}. Expected: {', '.join(KINDS)}")
+        self.name = name
+        self.kind = kind
+        self.module = module
+        self.batch = batch
+        self.needs_repair = needs_repair
+        self.cost = cost
+        self.elite = elite
+        self._function = None
+
+    @property
+    def fqn(self):
+        return f"{self.module}.{self.name}"
+
+    @property
+    def function(self):
+        if self._function is None:
+            self._function = getattr(importlib.import_module(self.module), self.name)
+        return self._function
+
+    def __repr__(self):
+        return f"Operator({self.fqn}, {self.kind})"
+
+
+# registered operators by fqn, in registration order
+OPERATORS = {}
+
+
+def register(name, kind, module, **metadata):
+    operator = Operator(name, kind, module, **metadata)
+    if any(other.name == name and other.kind == kind for other in OPERATORS.values()):
+        raise ValueError(f"A {kind} operator named {name} is already registered")
+    OPERATORS[operator.fqn] = operator
+    return operator
+
+
+def list_operators(kind=None):
+    return [operator for operator in OPERATORS.values() if kind is None or operator.kind == kind]
+
+
+def get_operator(name, kind=None):
+    # by fqn or, within `kind`, by short name (as in config.json)
+    if name in OPERATORS and (kind is None or OPERATORS[name].kind == kind):
+        return OPERATORS[name]
+    for operator in list_operators(kind):
+        if operator.name == name:
+            return operator
+    raise ValueError(
+        f"Cannot find function {name}. "
+        f"Try one of: {', '.join(operator.name for operator in list_operators(kind))}"
+    )
+
+
+register("random_delete_breed", "breed", "example_function_file", cost=4)
+register("random_delete_mutation", "mutate", "example_function_file")
+register("select_children", "select", "example_function_file", batch=True)
+
+register("add_mutate", "mutate", "evolutionary_functions", cost=2)
+register("delete_disliked_mutate", "mutate", "evolutionary_functions")
+register("delete_longest_task", "mutate", "evolutionary_functions")
+register("delete_lowest_priority", "mutate", "evolutionary_functions")
+register("tournament_select", "select", "evolutionary_functions", batch=True)
+
+register("dominant_solution_breed_swap_employees", "breed", "dominance_hierarchy_functions", needs_repair=True, cost=5, elite=2)
+register("dominant_solution_breed_happy_vs_productive", "breed", "dominance_hierarchy_functions", needs_repair=True, cost=5, elite=2)
+register("dominant_solution_mutate", "mutate", "dominance_hierarchy_functions", needs_repair=True, cost=3)
+register("dominant_solution_select", "select", "dominance_hierarchy_functions", batch=True)
+
+register("breed", "breed", "lukasz_function", needs_repair=True, cost=4)
+register("mutation", "mutate", "lukasz_function", needs_repair=True)
+register("select", "select", "lukasz_function", batch=True)
+
+register("shuffle_breed", "breed", "maciek_function_file", needs_repair=True, cost=4)
+register("repair_mutation", "mutate", "maciek_function_file", batch=True, needs_repair=True, cost=2)
+register("shuffle_mutation", "mutate", "maciek_function_file")
+register("select_children_by_age", "select", "maciek_function_file", batch=True)
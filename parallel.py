@@ -0,0 +1,177 @@
+import multiprocessing
+import random
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+import kernels
+import repair
+from genetic_algorithm import RankedPopulation, Solution, evaluate_population, import_function_by_fqn, rank_population
+from operators import OPERATORS
+
+# worker side: shared memory blocks must stay referenced as long as Solution uses them
+_worker_shared_memory = []
+_worker_functions = {}
+
+
+def _attach_array(name, shape, dtype):
+    shared_memory = SharedMemory(name=name)
+    _worker_shared_memory.append(shared_memory)
+    array = np.ndarray(shape, dtype=dtype, buffer=shared_memory.buf)
+    array.flags.writeable = False
+    return array
+
+
+def share_problem_data():
+    # Copies T, Z and p into shared memory (memory-mapped .npy files are mapped by the workers
+    # instead). Returns the shared memory blocks (the caller closes and unlinks them) and
+    # a picklable context for initialize_from_context.
+    shared_memory_blocks = []
+    shared_arrays = {}
+    mapped_arrays = {}
+    for key, array in (("T", Solution.T_array), ("Z", Solution.Z_array), ("p", Solution.p_array)):
+        source = getattr(Solution, key)
+        if isinstance(source, np.memmap) and source.filename and source.mode == "r":
+            mapped_arrays[key] = source.filename
+            continue
+        array = np.ascontiguousarray(array)
+        shared_memory = SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=shared_memory.buf)[...] = array
+        shared_memory_blocks.append(shared_memory)
+        shared_arrays[key] = (shared_memory.name, array.shape, array.dtype.str)
+
+    initialize_arguments = Solution.get_initialize_arguments()
+    for key in [*shared_arrays, *mapped_arrays]:
+        del initialize_arguments[key]
+
+    context = {
+        "shared_arrays": shared_arrays,
+        "mapped_arrays": mapped_arrays,
+        "initialize_arguments": initialize_arguments,
+        "drop_policy": repair.default_drop_policy,
+        "kernel_backend": kernels.backend,
+    }
+    return shared_memory_blocks, context
+
+
+def release_shared_memory(shared_memory_blocks):
+    for shared_memory in shared_memory_blocks:
+        shared_memory.close()
+        shared_memory.unlink()
+
+
+def initialize_from_context(context):
+    # Solution keeps the problem in class attributes, which spawned processes do not inherit
+    # (and forked ones should not rely on), so every process initializes it from the shared arrays.
+    arrays = {key: _attach_array(*description) for key, description in context["shared_arrays"].items()}
+    arrays.update({key: np.load(filename, mmap_mode="r") for key, filename in context["mapped_arrays"].items()})
+    kernels.set_backend(context["kernel_backend"])
+    Solution.initialize(**arrays, **context["initialize_arguments"])
+    repair.set_default_drop_policy(context["drop_policy"])
+
+
+def _init_worker(context, functions):
+    initialize_from_context(context)
+    _worker_functions.update({key: import_function_by_fqn(fqn) for key, fqn in functions.items()})
+
+
+def compacted(solutions):
+    # assignment vectors pickle m times smaller than R
+    for sol in solutions:
+        try:
+            sol.compact()
+        except ValueError:
+            pass
+    return solutions
+
+
+def _breed_mutate_evaluate(params):
+    (parents, size, seed) = params
+    random.seed(seed)
+    np.random.seed(seed % 2**32)
+
+    evaluations, is_legal_calls = Solution.evaluations, Solution.is_legal_calls
+    # a shard with the elite may hold a pair more than its share of the children
+    children = list(_worker_functions["breed_function"](parents))[:size]
+    children = _worker_functions["mutate_function"](children)
+    evaluate_population(children)
+
+    return compacted(list(children)), Solution.evaluations - evaluations, Solution.is_legal_calls - is_legal_calls
+
+
+class ParallelPipeline():
+    """
+    Pool of worker processes breeding, mutating and evaluating children of one population.
+
+    T, Z and p are copied once into shared memory and every worker maps them, so the problem
+    data is never pickled per task. The pool lives until `close` (use it as a context manager),
+    so it is reused across generations. Each generation the population is shuffled and split
+    into shards of paired parents, one per worker; parents are only mated within their shard.
+    A breeding registered with `elite` (see `operators.Operator`) mates the best individuals of
+    the whole population with the rest, so the elite of the population, ranked as in the serial
+    run, is added to every shard and only the others are split.
+    Every shard gets its own seed drawn from `random`, so runs stay reproducible for a given
+    seed and number of workers.
+    """
+    def __init__(self, workers, breed_function, mutate_function):
+        self.workers = workers
+        self.elite = OPERATORS[breed_function].elite if breed_function in OPERATORS else 0
+        self._shared_memory, context = share_problem_data()
+        functions = {"breed_function": breed_function, "mutate_function": mutate_function}
+        self.pool = multiprocessing.Pool(workers, initializer=_init_worker, initargs=(context, functions))
+
+    def _shards(self, population):
+        # Returns (shard, number of children or None for all) pairs. Parents are distributed in pairs, so the
+        # shards breed as many children as the whole population would; the elite is in every shard, ranked first.
+        ranking = rank_population(population) if self.elite else np.arange(len(population))
+        elite = [int(i) for i in ranking[:self.elite]]
+        rest = [int(i) for i in ranking[self.elite:]]
+        random.shuffle(rest)
+        pairs = len(population) // 2
+        no_shards = max(1, min(self.workers, pairs))
+
+        sizes = [2 * (pairs // no_shards + (i < pairs % no_shards)) for i in range(no_shards)]
+        rest_sizes = [max(0, size - len(elite)) for size in sizes]
+        # the leftover individuals (the odd one, and the places the elite takes in every shard), last shards first
+        for i in range(len(rest) - sum(rest_sizes)):
+            rest_sizes[-1 - i % no_shards] += 1
+
+        position = np.empty(len(population), dtype=int)
+        position[ranking] = np.arange(len(population))
+        shards = []
+        start = 0
+        for size, rest_size in zip(sizes, rest_sizes):
+            indices = elite + rest[start:start + rest_size]
+            start += rest_size
+            shard = [population[i] for i in indices]
+            if self.elite:
+                shards.append((RankedPopulation(shard, np.argsort(position[indices], kind="stable")), size))
+            else:
+                shards.append((shard, None))
+        return shards
+
+    def breed_and_mutate(self, population):
+        shards = self._shards(compacted(population))
+        tasks = [(shard, size, random.getrandbits(64)) for shard, size in shards]
+
+        children = []
+        for shard_children, evaluations, is_legal_calls in self.pool.map(_breed_mutate_evaluate, tasks):
+            children.extend(shard_children)
+            # counters of the workers count towards the ones of the main process
+            Solution.evaluations += evaluations
+            Solution.is_legal_calls += is_legal_calls
+        return children
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+        release_shared_memory(self._shared_memory)
+        self._shared_memory = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            self.pool.terminate()
+        self.close()
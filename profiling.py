@@ -0,0 +1,152 @@
+import cProfile
+import pstats
+import time
+import tracemalloc
+
+from genetic_algorithm import PHASES, Solution
+
+
+class GenerationHook():
+    """
+    Interface of hooks attached to `evolutionary_algorithm` (`hooks` argument). For every generation
+    `start_generation` is called, then `start_phase`/`end_phase` around each of `PHASES` (with a parallel
+    pipeline, "breed" covers breeding, mutation and evaluation of children in the workers and "mutate" is empty),
+    then `end_generation`, which returns extra columns for `results.csv` (a dict, may be empty).
+    `close` is called at the end of the run and returns a summary for `profile_summary.json` (or None).
+    """
+    name = None
+
+    def start_generation(self, generation):
+        pass
+
+    def start_phase(self, phase):
+        pass
+
+    def end_phase(self, phase):
+        pass
+
+    def end_generation(self, generation):
+        return {}
+
+    def close(self):
+        return None
+
+
+class PhaseTimer(GenerationHook):
+    # Wall-clock time of every phase, fitness evaluations and is_legal calls per generation.
+    name = "timing"
+
+    def __init__(self):
+        self.totals = {f"{name}_time": 0.0 for name in PHASES}
+        self.totals.update(evaluations=0, is_legal_calls=0)
+        self.generations = 0
+
+    def start_generation(self, generation):
+        self.row = {f"{name}_time": 0.0 for name in PHASES}
+        self._evaluations = Solution.evaluations
+        self._is_legal_calls = Solution.is_legal_calls
+
+    def start_phase(self, phase):
+        self._start = time.perf_counter()
+
+    def end_phase(self, phase):
+        self.row[f"{phase}_time"] += time.perf_counter() - self._start
+
+    def end_generation(self, generation):
+        self.row["evaluations"] = Solution.evaluations - self._evaluations
+        self.row["is_legal_calls"] = Solution.is_legal_calls - self._is_legal_calls
+        for key, value in self.row.items():
+            self.totals[key] += value
+        self.generations += 1
+        return self.row
+
+    def close(self):
+        total_time = sum(self.totals[f"{name}_time"] for name in PHASES)
+        return {
+            "generations": self.generations,
+            "totals": self.totals,
+            "per_generation": {key: value / max(1, self.generations) for key, value in self.totals.items()},
+            "time_share": {name: self.totals[f"{name}_time"] / total_time if total_time else 0.0 for name in PHASES},
+        }
+
+
+class GenerationRangeHook(GenerationHook):
+    # Active from the start of generation `first` to the end of generation `last` (0-based, inclusive);
+    # subclasses override `begin` and `finish`, which do nothing here like the GenerationHook methods.
+    def __init__(self, first, last, path):
+        self.first = first
+        self.last = last
+        self.path = path
+        self.active = False
+
+    def start_generation(self, generation):
+        if generation == self.first:
+            self.active = True
+            self.begin()
+
+    def end_generation(self, generation):
+        if self.active and generation == self.last:
+            self.active = False
+            self.finish()
+        return {}
+
+    def close(self):
+        if self.active:
+            self.active = False
+            self.finish()
+        return None
+
+    def begin(self):
+        pass
+
+    def finish(self):
+        pass
+
+
+class CProfileHook(GenerationRangeHook):
+    # cProfile of generations first..last, saved to `path` (read with pstats or snakeviz)
+    name = "cprofile"
+
+    def begin(self):
+        self.profile = cProfile.Profile()
+        self.profile.enable()
+
+    def finish(self):
+        self.profile.disable()
+        pstats.Stats(self.profile).dump_stats(self.path)
+
+
+class TracemallocHook(GenerationRangeHook):
+    # allocations made in generations first..last still alive at the end of `last`, 50 biggest lines written to `path`
+    name = "tracemalloc"
+
+    def begin(self):
+        tracemalloc.start()
+        self.snapshot = tracemalloc.take_snapshot()
+
+    def finish(self):
+        statistics = tracemalloc.take_snapshot().compare_to(self.snapshot, "lineno")
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        with open(self.path, "w") as f:
+            f.write(f"peak traced memory: {peak} B\n")
+            for statistic in statistics[:50]:
+                f.write(f"{statistic}\n")
+
+
+def hooks_from_config(profiling, directory):
+    """
+    Hooks for the `profiling` object of the configuration: `timing` (bool) adds `PhaseTimer`,
+    `cprofile` and `tracemalloc` (`[first, last]` generation range) write `profile.prof`
+    and `tracemalloc.txt` to `directory`.
+    """
+    if not profiling:
+        return []
+    hooks = []
+    if profiling.get("timing"):
+        hooks.append(PhaseTimer())
+    if "cprofile" in profiling:
+        hooks.append(CProfileHook(*profiling["cprofile"], directory / "profile.prof"))
+    if "tracemalloc" in profiling:
+        hooks.append(TracemallocHook(*profiling["tracemalloc"], directory / "tracemalloc.txt"))
+    return hooks
@@ -0,0 +1,174 @@
+import random
+
+import numpy as np
+
+import kernels
+from genetic_algorithm import Solution, R_to_assignment
+
+
+# Order in which tasks of an over-budget employee are dropped (lowest key first).
+DROP_POLICIES = {
+    "shortest_first": lambda: Solution.T_array,
+    "lowest_priority": lambda: np.broadcast_to(Solution.p_array, Solution.T_array.shape),
+    "lowest_satisfaction": lambda: Solution.Z_array,
+}
+
+default_drop_policy = "shortest_first"
+
+# How repair_population assigns unassigned tasks (`fill`).
+FILL_ORDERS = ("first_fit", "random")
+
+# Largest number of cells of R stacked at once by repair_population (each temporary is that many values).
+REPAIR_CHUNK = 2**22
+
+
+def set_default_drop_policy(drop_policy):
+    global default_drop_policy
+    if drop_policy not in DROP_POLICIES:
+        raise ValueError(
+            f"Unknown drop policy {drop_policy}. Try one of: {', '.join(DROP_POLICIES.keys())}"
+        )
+    default_drop_policy = drop_policy
+
+
+def resolve_duplicates(Rs, rng):
+    # Keeps one randomly chosen employee for every task assigned more than once. The keys are drawn
+    # only for duplicated tasks, by individual and task, so the draws do not depend on how the
+    # individuals are split into chunks.
+    individuals, tasks = np.nonzero(np.sum(Rs, axis=1) > 1)
+    if len(individuals):
+        keep = np.argmax(rng.random((len(individuals), Rs.shape[1])) * Rs[individuals, :, tasks], axis=1)
+        Rs[individuals, :, tasks] = 0
+        Rs[individuals, keep, tasks] = 1
+    return Rs
+
+
+def drop_over_budget(Rs, drop_policy):
+    # For every employee over L, drops their tasks in the policy order until the rest fits in L.
+    order = np.argsort(DROP_POLICIES[drop_policy](), axis=1, kind="stable")
+    if kernels.compiled(Solution.T_array, Rs):
+        return kernels.drop_over_budget(Rs, Solution.T_array, order, Solution.L)
+    order = np.broadcast_to(order, Rs.shape)
+
+    R_sorted = np.take_along_axis(Rs, order, axis=2)
+    time_sorted = np.take_along_axis(np.broadcast_to(Solution.T_array, Rs.shape), order, axis=2) * R_sorted
+    load = np.sum(time_sorted, axis=2, keepdims=True)
+    dropped_before = np.cumsum(time_sorted, axis=2) - time_sorted
+
+    drop = (R_sorted == 1) & (load - dropped_before > Solution.L)
+    np.put_along_axis(Rs, order, np.where(drop, 0, R_sorted), axis=2)
+    return Rs
+
+
+def refill(load, unassigned):
+    # Unassigned tasks, highest priority first, go to the first employee that still has time for them.
+    # Sequential over tasks (every assignment uses up time), vectorized over individuals and employees.
+    # Updates `load` (individuals x employees) in place and returns the employee given each task, or -1.
+    T = Solution.T_array
+    tasks = np.argsort(-Solution.p_array, kind="stable")
+    if kernels.compiled(T, load):
+        return kernels.refill(load, unassigned, T, tasks, Solution.L)
+
+    filled = np.full(unassigned.shape, -1)
+    tasks = tasks[np.any(unassigned[:, tasks], axis=0)]
+
+    for task in tasks:
+        fits = (load + T[:, task] <= Solution.L) & unassigned[:, task, None]
+        individuals = np.flatnonzero(np.any(fits, axis=1))
+        employees = np.argmax(fits[individuals], axis=1)
+        filled[individuals, task] = employees
+        load[individuals, employees] += T[employees, task]
+
+    return filled
+
+
+def refill_random(load, unassigned, max_attempts, rng):
+    # Like refill, but every unassigned task tries up to `max_attempts` employees in a random order
+    # (all of them for None) and goes to the first one with time for it, so no employee is preferred.
+    T = Solution.T_array
+    num_employees = load.shape[1]
+    attempts = num_employees if max_attempts is None else min(max_attempts, num_employees)
+    filled = np.full(unassigned.shape, -1)
+    tasks = np.argsort(-Solution.p_array, kind="stable")
+    tasks = tasks[np.any(unassigned[:, tasks], axis=0)]
+
+    for task in tasks:
+        individuals = np.flatnonzero(unassigned[:, task])
+        candidates = np.argsort(rng.random((len(individuals), num_employees)), axis=1)[:, :attempts]
+        fits = load[individuals[:, None], candidates] + T[candidates, task] <= Solution.L
+        found = np.any(fits, axis=1)
+        individuals = individuals[found]
+        employees = candidates[found, np.argmax(fits[found], axis=1)]
+        filled[individuals, task] = employees
+        load[individuals, employees] += T[employees, task]
+
+    return filled
+
+
+def repair_population(children, drop_policy=None, duplicates=True, fill=True, max_attempts=None):
+    """
+    Repairs a whole batch of children in place and returns it. Steps (each optional):
+
+    - `duplicates` - a task assigned to several employees keeps one of them, chosen at random,
+    - `drop_policy` - tasks of employees over the time budget `L` are dropped in the order given
+      by one of `DROP_POLICIES` (`None` means `default_drop_policy`, `False` skips the step),
+    - `fill` - unassigned tasks are assigned by priority: `True` or `"first_fit"` gives each to the first
+      employee with enough time left, `"random"` tries up to `max_attempts` employees in a random order
+      (all of them for None, see `refill_random`).
+
+    Repaired children are stored as assignment vectors when every task has at most one employee.
+    The first two steps stack at most `REPAIR_CHUNK` cells of R at once, with the same result for any
+    chunk size (see `resolve_duplicates`); `fill` only needs the time used by
+    every employee and the unassigned tasks, so it runs once for the whole batch.
+    """
+    if not children:
+        return children
+    if drop_policy is None:
+        drop_policy = default_drop_policy
+    if fill is True:
+        fill = "first_fit"
+    if fill and fill not in FILL_ORDERS:
+        raise ValueError(f"Unknown fill order {fill}. Try one of: {', '.join(FILL_ORDERS)}")
+    rng = np.random.default_rng(random.getrandbits(32)) if duplicates or fill == "random" else None
+
+    repaired, loads, unassigned = [], [], []
+    chunk = max(1, REPAIR_CHUNK // (Solution.num_employees * Solution.num_tasks))
+    for start in range(0, len(children), chunk):
+        Rs = np.array([child.to_array() for child in children[start:start + chunk]])
+
+        if duplicates:
+            Rs = resolve_duplicates(Rs, rng)
+        if drop_policy:
+            Rs = drop_over_budget(Rs, drop_policy)
+        if fill:
+            loads.append(np.sum(Solution.T_array * Rs, axis=2))
+            unassigned.append(np.sum(Rs, axis=1) == 0)
+
+        for R in Rs:
+            try:
+                repaired.append(R_to_assignment(R))
+            except ValueError:
+                repaired.append(R)
+
+    filled = None
+    if fill == "first_fit":
+        filled = refill(np.concatenate(loads), np.concatenate(unassigned))
+    elif fill == "random":
+        filled = refill_random(np.concatenate(loads), np.concatenate(unassigned), max_attempts, rng)
+
+    for i, (child, result) in enumerate(zip(children, repaired)):
+        if filled is not None:
+            tasks = np.flatnonzero(filled[i] >= 0)
+            if result.ndim == 1:
+                result[tasks] = filled[i, tasks]
+            else:
+                result[filled[i, tasks], tasks] = 1
+        if result.ndim == 1:
+            child.assignment = result
+        else:
+            try:
+                child.assignment = R_to_assignment(result)
+            except ValueError:
+                child.R = result.tolist()
+
+    return children
@@ -0,0 +1,112 @@
+import random
+
+import numpy as np
+
+from genetic_algorithm import Solution
+
+STRATEGIES = ("random", "ratio", "satisfaction", "regret")
+
+
+def strategy_counts(size, proportions):
+    # splits `size` individuals between the strategies in `proportions` (largest remainder)
+    if not proportions or set(proportions) - set(STRATEGIES):
+        raise ValueError(f"Seeding proportions must be given for some of: {', '.join(STRATEGIES)}")
+    if any(not isinstance(weight, (int, float)) or weight < 0 for weight in proportions.values()) or sum(proportions.values()) <= 0:
+        raise ValueError("Seeding proportions must be numbers ≥ 0 with a positive sum")
+    weights = np.array([proportions.get(strategy, 0) for strategy in STRATEGIES], dtype=float)
+    shares = size * weights / weights.sum()
+    counts = np.floor(shares).astype(int)
+    counts[np.argsort(counts - shares, kind="stable")[:size - counts.sum()]] += 1
+    return dict(zip(STRATEGIES, counts.tolist()))
+
+
+def greedy_assignments(order, employee_scores, rng):
+    """
+    Builds len(order) assignment vectors at once. Individual k takes the tasks in the order of `order[k]`
+    and gives each one to the employee with the highest `employee_scores(tasks)` (an (individuals, employees)
+    array for the current task of every individual, ties broken at random) who still has time for it;
+    a task nobody has time for stays unassigned. Sequential over tasks, vectorized over individuals and employees.
+    """
+    T = Solution.T_array
+    size, num_tasks = order.shape
+    assignments = np.full((size, num_tasks), -1, dtype=np.int32)
+    load = np.zeros((size, Solution.num_employees), dtype=T.dtype)
+    individuals = np.arange(size)
+
+    for position in range(num_tasks):
+        tasks = order[:, position]
+        time = T[:, tasks].T
+        fits = load + time <= Solution.L
+        # random tie-breaking below the resolution of the scores, so no employee is always served first
+        scores = employee_scores(tasks) + rng.random(fits.shape) * 1e-6
+        employees = np.argmax(np.where(fits, scores, -np.inf), axis=1)
+        assigned = fits[individuals, employees]
+        assignments[individuals[assigned], tasks[assigned]] = employees[assigned]
+        load[individuals[assigned], employees[assigned]] += time[individuals[assigned], employees[assigned]]
+
+    return assignments
+
+
+def noisy_order(keys, size, rng, noise=0.2):
+    # task orders of `size` individuals: descending `keys`, each scaled by a random factor in [1 - noise, 1 + noise]
+    keys = np.asarray(keys, dtype=float)
+    keys = keys - keys.min() + 1
+    return np.argsort(-keys * rng.uniform(1 - noise, 1 + noise, (size, len(keys))), axis=1, kind="stable")
+
+
+def random_greedy(size, rng):
+    # like taskplanner.solve (random task order), but every task goes to a random employee who has time for it
+    order = np.argsort(rng.random((size, Solution.num_tasks)), axis=1)
+    return greedy_assignments(order, lambda tasks: np.zeros((len(tasks), Solution.num_employees)), rng)
+
+
+def ratio_greedy(size, rng):
+    # highest priority per time first, to the fastest employee
+    T = Solution.T_array
+    ratio = Solution.p_array / np.maximum(T.min(axis=0), 1)
+    return greedy_assignments(noisy_order(ratio, size, rng), lambda tasks: -T[:, tasks].T, rng)
+
+
+def satisfaction_greedy(size, rng):
+    # tasks somebody likes most first, to the most satisfied employee
+    Z = Solution.Z_array
+    return greedy_assignments(noisy_order(Z.max(axis=0), size, rng), lambda tasks: Z[:, tasks].T, rng)
+
+
+def regret_greedy(size, rng):
+    # tasks with the largest regret (time of the second fastest employee minus the fastest) first, to the fastest employee
+    T = Solution.T_array
+    fastest = np.sort(T, axis=0)
+    regret = fastest[1] - fastest[0] if len(T) > 1 else np.zeros(T.shape[1])
+    return greedy_assignments(noisy_order(regret, size, rng), lambda tasks: -T[:, tasks].T, rng)
+
+
+SEEDING_FUNCTIONS = {
+    "random": random_greedy,
+    "ratio": ratio_greedy,
+    "satisfaction": satisfaction_greedy,
+    "regret": regret_greedy,
+}
+
+
+def seed_population(size, proportions=None, seed=None):
+    """
+    Builds a starting population of `size` individuals (assignment-backed Solutions) in one batch per strategy,
+    mixing the strategies of `STRATEGIES` by `proportions` (dict of strategy -> weight, default only `"random"`):
+
+    - `random` - random task order, each task to a random employee with time left,
+    - `ratio` - tasks by priority per time, each to the fastest employee with time left,
+    - `satisfaction` - tasks by the highest satisfaction of any employee, each to the most satisfied one,
+    - `regret` - tasks by the time lost when the fastest employee cannot take them, each to the fastest one.
+
+    Task orders of the greedy strategies are perturbed at random, so their individuals differ.
+    Reproducible with `seed` (by default drawn from `random`, so `random.seed` fixes the population too).
+    Solution must be initialized.
+    """
+    counts = strategy_counts(size, proportions or {"random": 1})
+    rng = np.random.default_rng(random.getrandbits(64) if seed is None else seed)
+    population = []
+    for strategy, count in counts.items():
+        if count:
+            population.extend(Solution(assignment=assignment) for assignment in SEEDING_FUNCTIONS[strategy](count, rng))
+    return population
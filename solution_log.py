@@ -0,0 +1,96 @@
+import struct
+
+import numpy as np
+
+from genetic_algorithm import R_to_assignment, assignment_to_array
+
+# Binary log of the best solution, written by `Logger` when `solutions_log_format` is "binary".
+# A record is only written when the best solution changes.
+#
+# <name>.bin - header: MAGIC, number of employees and tasks (uint32), dtype of assignment vectors (4 bytes),
+#              then records: generation (int64), kind (uint8) and the payload:
+#              - ASSIGNMENT: assignment vector (see `R_to_assignment`) in the smallest signed type fitting the employees,
+#              - PACKED: R packed 8 cells per byte (`np.packbits` of the flattened matrix), used when a task has several employees.
+# <name>.idx - (generation, offset of the record in the .bin file) of every record, see INDEX_DTYPE.
+
+SOLUTIONS_LOG_FORMATS = ("json", "binary")
+
+MAGIC = b"SOLLOG01"
+HEADER = struct.Struct("<II4s")
+RECORD_HEADER = struct.Struct("<qB")
+ASSIGNMENT, PACKED = 0, 1
+INDEX_DTYPE = np.dtype([("generation", "<i8"), ("offset", "<i8")])
+
+
+def assignment_dtype(num_employees):
+    return np.dtype(np.min_scalar_type(-num_employees)).newbyteorder("<")
+
+
+def encode_header(num_employees, num_tasks):
+    return MAGIC + HEADER.pack(num_employees, num_tasks, assignment_dtype(num_employees).str.encode().ljust(4))
+
+
+def encode_record(generation, R):
+    R = np.asarray(R)
+    try:
+        payload = R_to_assignment(R).astype(assignment_dtype(R.shape[0])).tobytes()
+        kind = ASSIGNMENT
+    except ValueError:
+        payload = np.packbits(R.ravel() != 0).tobytes()
+        kind = PACKED
+    return RECORD_HEADER.pack(generation, kind) + payload
+
+
+def encode_index_entry(generation, offset):
+    return np.array([(generation, offset)], dtype=INDEX_DTYPE).tobytes()
+
+
+class SolutionLog():
+    """
+    Reader of a binary solutions log (`solutions.bin` with its index `solutions.idx`).
+
+    `best_R(generation)` reconstructs the best R after any logged generation: the record of the last
+    improvement at or before it. `generations` are the generations in which the best solution changed.
+    """
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a binary solutions log")
+            self.num_employees, self.num_tasks, dtype = HEADER.unpack(f.read(HEADER.size))
+        self.assignment_dtype = np.dtype(dtype.rstrip().decode())
+        self.index = np.fromfile(f"{str(path).removesuffix('.bin')}.idx", dtype=INDEX_DTYPE)
+
+    @property
+    def generations(self):
+        return self.index["generation"]
+
+    def __len__(self):
+        return len(self.index)
+
+    def _payload_size(self, kind):
+        if kind == ASSIGNMENT:
+            return self.num_tasks * self.assignment_dtype.itemsize
+        return (self.num_employees * self.num_tasks + 7) // 8
+
+    def read_record(self, i):
+        # (generation, R as an array) of the i-th record
+        with open(self.path, "rb") as f:
+            f.seek(int(self.index["offset"][i]))
+            generation, kind = RECORD_HEADER.unpack(f.read(RECORD_HEADER.size))
+            payload = f.read(self._payload_size(kind))
+        if kind == ASSIGNMENT:
+            R = assignment_to_array(np.frombuffer(payload, dtype=self.assignment_dtype), self.num_employees)
+        else:
+            bits = np.unpackbits(np.frombuffer(payload, dtype=np.uint8), count=self.num_employees * self.num_tasks)
+            R = bits.reshape(self.num_employees, self.num_tasks).astype(int)
+        return generation, R
+
+    def best_array(self, generation):
+        i = np.searchsorted(self.generations, generation, side="right") - 1
+        if i < 0:
+            raise ValueError(f"No solution logged at or before generation {generation}")
+        return self.read_record(i)[1]
+
+    def best_R(self, generation):
+        return self.best_array(generation).tolist()
@@ -82,4 +82,99 @@ def solve(T, Z, L, num_employees, num_tasks):
             task = tasks_order.pop()
             R[j][task] = 1
             time_left -= T[j][task]
-    return R
\ No newline at end of file
+    return R
+
+
+# Vectorized counterparts of generate_tasks, generate_employees and generate_input_matrices
+# (same distributions), driven by one numpy.random.Generator. Tasks and employees are dicts of arrays;
+# categories of employees are boolean matrices (employee x category).
+NUM_CATEGORIES = 11  # tasks draw categories 0..10, employees like / are good at 0..9
+
+
+def generate_tasks_arrays(num_tasks, rng):
+    return {
+        "difficulty": np.maximum(1, np.trunc(rng.normal(8, 8, num_tasks))).astype(int),
+        "category": rng.integers(0, 11, num_tasks),
+        "priority": rng.integers(0, 11, num_tasks),
+    }
+
+
+def _sample_categories(counts, rng):
+    # row i: `counts[i]` different categories out of 0..9
+    ranks = np.argsort(np.argsort(rng.random((len(counts), 10)), axis=1), axis=1)
+    categories = np.zeros((len(counts), NUM_CATEGORIES), dtype=bool)
+    categories[:, :10] = ranks < counts[:, None]
+    return categories
+
+
+def generate_employees_arrays(num_employees, rng):
+    level = rng.integers(1, 6, num_employees)
+    number_of_good_categories = np.clip(rng.integers(0, 11, num_employees) + rng.integers(0, level + 1), 0, 10)
+    number_of_liked_categories = np.minimum(10 - number_of_good_categories + rng.integers(0, 3, num_employees), 10)
+    comfortable_difficulty_start = np.maximum(rng.integers(0, 16, num_employees) - 2 * level, 0)
+    comfortable_difficulty_diff = rng.integers(0, level**2 + 1) + rng.integers(0, 6, num_employees)
+
+    return {
+        "experience": level,
+        "likes_categories": _sample_categories(number_of_liked_categories, rng),
+        # generate_employees samples as many good categories as liked ones
+        "is_good_at_categories": _sample_categories(number_of_liked_categories, rng),
+        "comfortable_difficulty": np.stack(
+            [comfortable_difficulty_start, comfortable_difficulty_start + comfortable_difficulty_diff], axis=1
+        ),
+    }
+
+
+def tasks_to_arrays(tasks):
+    return {
+        "difficulty": np.array([task.difficulty for task in tasks], dtype=int),
+        "category": np.array([task.category for task in tasks], dtype=int),
+        "priority": np.array([task.priority for task in tasks], dtype=int),
+    }
+
+
+def employees_to_arrays(employees):
+    def categories(lists):
+        matrix = np.zeros((len(lists), NUM_CATEGORIES), dtype=bool)
+        for i, categories in enumerate(lists):
+            matrix[i, [c for c in categories if 0 <= c < NUM_CATEGORIES]] = True
+        return matrix
+
+    return {
+        "experience": np.array([employee.experience for employee in employees]),
+        "likes_categories": categories([employee.likes_categories for employee in employees]),
+        "is_good_at_categories": categories([employee.is_good_at_categories for employee in employees]),
+        "comfortable_difficulty": np.array([employee.comfortable_difficulty[:2] for employee in employees]).reshape(-1, 2),
+    }
+
+
+def generate_input_matrices_arrays(employees, tasks, rng):
+    # Employee.predict_time and Employee.predict_satisfaction for all (employee, task) pairs at once
+    difficulty = tasks["difficulty"][None, :]
+    is_good = employees["is_good_at_categories"][:, tasks["category"]]
+    likes = employees["likes_categories"][:, tasks["category"]]
+    comfortable = (employees["comfortable_difficulty"][:, :1] < difficulty) & (difficulty < employees["comfortable_difficulty"][:, 1:])
+
+    loc = np.maximum(0, 10 - employees["experience"][:, None] - 5 * is_good)
+    T = np.rint(difficulty + np.abs(rng.normal(loc, 4))).astype(int)
+
+    loc = 3 + 2 * (likes.astype(int) + comfortable)
+    Z = np.rint(np.clip(rng.normal(loc, 2), 0, 10)).astype(int)
+
+    return T, Z, tasks["priority"].copy()
+
+
+def generate_instance(num_tasks, num_employees=None, employees=None, seed=None):
+    """
+    Generates T, Z and p (numpy arrays) of a random instance with `num_tasks` tasks, like
+    `generate_input_matrices(generate_employees(num_employees), generate_tasks(num_tasks))`
+    but vectorized and driven only by `seed` (an int, `None` or a `numpy.random.Generator`).
+    `employees` (a list of `Employee`) can be given instead of `num_employees`.
+    """
+    rng = np.random.default_rng(seed)
+    tasks = generate_tasks_arrays(num_tasks, rng)
+    if employees is None:
+        employees = generate_employees_arrays(num_employees, rng)
+    else:
+        employees = employees_to_arrays(employees)
+    return generate_input_matrices_arrays(employees, tasks, rng)
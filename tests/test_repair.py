@@ -0,0 +1,68 @@
+import random
+import unittest
+
+import numpy as np
+
+import repair
+from genetic_algorithm import Solution
+from taskplanner import generate_instance
+
+
+class RepairPopulationTest(unittest.TestCase):
+    def setUp(self):
+        T, Z, p = generate_instance(60, 8, seed=0)
+        Solution.initialize(T, Z, p, 40, 8, 60)
+        self.chunk = repair.REPAIR_CHUNK
+
+    def tearDown(self):
+        repair.REPAIR_CHUNK = self.chunk
+
+    def repaired(self, chunk, **kwargs):
+        # children with duplicated tasks in some individuals only, so that some chunks have none
+        rng = np.random.default_rng(1)
+        children = []
+        for i in range(30):
+            density = 0.3 if i % 4 == 0 else 0.01
+            children.append(Solution((rng.random((8, 60)) < density).astype(int).tolist()))
+        repair.REPAIR_CHUNK = chunk
+        random.seed(2)
+        repair.repair_population(children, **kwargs)
+        return [child.to_array() for child in children]
+
+    def test_chunk_size_does_not_change_the_result(self):
+        for kwargs in ({}, {"fill": False}, {"drop_policy": "lowest_priority"}, {"fill": "random", "max_attempts": 2}):
+            whole = self.repaired(2**22, **kwargs)
+            for chunk in (8 * 60, 3 * 8 * 60):
+                with self.subTest(chunk=chunk, **kwargs):
+                    self.assertTrue(all(np.array_equal(a, b) for a, b in zip(whole, self.repaired(chunk, **kwargs))))
+
+    def test_repaired_children_are_legal(self):
+        for R in self.repaired(2**22):
+            self.assertTrue(Solution(R.tolist()).is_legal())
+
+    def test_random_fill_spreads_tasks_over_employees(self):
+        # every child starts empty: first fit gives the first tasks to employee 0, random fill does not
+        children = [Solution(assignment=[-1] * 60) for _ in range(20)]
+        random.seed(3)
+        repair.repair_population(children, fill="random")
+        first_tasks = np.array([child.assignment[np.argsort(-Solution.p_array, kind="stable")[0]] for child in children])
+        self.assertGreater(len(set(first_tasks)), 1)
+        self.assertTrue(all(child.is_legal() for child in children))
+
+    def test_random_fill_keeps_mutating(self):
+        children = [Solution(assignment=[-1] * 60) for _ in range(5)]
+        random.seed(4)
+        once = [child.assignment.copy() for child in repair.repair_population(children, fill="random", max_attempts=1)]
+        for child in children:
+            child.unassign(0)
+            child.unassign(1)
+        twice = [child.assignment for child in repair.repair_population(children, fill="random", max_attempts=1)]
+        self.assertFalse(all(np.array_equal(a, b) for a, b in zip(once, twice)))
+
+    def test_unknown_fill_order(self):
+        with self.assertRaises(ValueError):
+            repair.repair_population([Solution(assignment=[-1] * 60)], fill="best")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import copy
+import pickle
+import unittest
+
+import numpy as np
+
+from genetic_algorithm import Solution
+from taskplanner import generate_instance, solve
+
+
+class TrackedRTest(unittest.TestCase):
+    def setUp(self):
+        T, Z, p = generate_instance(30, 5, seed=0)
+        Solution.initialize(T, Z, p, 40, 5, 30)
+        self.sol = Solution(solve(*Solution.get_data_and_config()))
+        self.sol.get_detailed_f()
+
+    def assertFitnessUpToDate(self, sol):
+        fresh = Solution([list(row) for row in sol.R])
+        self.assertEqual(sol.get_detailed_f(), fresh.get_detailed_f())
+        self.assertEqual(sol.is_legal(), fresh.is_legal())
+
+    def test_cell_writes(self):
+        self.sol.R[1][3] = 1 - self.sol.R[1][3]
+        self.sol.R[2] = [1] * 30
+        self.assertFitnessUpToDate(self.sol)
+
+    def test_reordering_a_row(self):
+        self.sol.R[0].reverse()
+        self.assertFitnessUpToDate(self.sol)
+        self.sol.R[1].sort()
+        self.assertFitnessUpToDate(self.sol)
+
+    def test_reordering_the_matrix_reindexes_the_rows(self):
+        for reorder in (lambda R: R.reverse(), lambda R: R.sort(key=sum)):
+            reorder(self.sol.R)
+            self.assertFitnessUpToDate(self.sol)
+            # later writes through a moved row count for the employee now at its index
+            self.sol.get_detailed_f()
+            self.sol.R[0][0] = 1 - self.sol.R[0][0]
+            self.assertFitnessUpToDate(self.sol)
+
+    def test_shape_changes_raise(self):
+        R = self.sol.R
+        changes = [
+            lambda: R.append([0] * 30), lambda: R.pop(), lambda: R.insert(0, [0] * 30), lambda: R.clear(),
+            lambda: R.extend([]), lambda: R.remove(R[0]), lambda: R.__delitem__(0), lambda: R.__imul__(2),
+            lambda: R[0].append(1), lambda: R[0].pop(), lambda: R[0].clear(), lambda: R[0].__delitem__(0),
+        ]
+        for change in changes:
+            with self.assertRaises(TypeError):
+                change()
+        self.assertEqual(np.array(R).shape, (5, 30))
+        self.assertFitnessUpToDate(self.sol)
+
+    def test_copies_are_plain_lists(self):
+        self.assertIs(type(copy.deepcopy(self.sol.R)[0]), list)
+        self.assertIs(type(pickle.loads(pickle.dumps(self.sol.R[0]))), list)
+
+
+if __name__ == "__main__":
+    unittest.main()